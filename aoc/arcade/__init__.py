@@ -1,3 +1,4 @@
 
 from .game import Game
 from .players import PlayerFollower
+from .terminal import TerminalRenderer
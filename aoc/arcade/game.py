@@ -3,8 +3,9 @@ import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from intcode import Tape, Interpreter
+from intcode import Tape, Interpreter, Channel
 
+import time
 import numpy as np
 
 class Game(object):
@@ -14,22 +15,48 @@ class Game(object):
     PADDLE = 3
     BALL   = 4
 
-    def __init__(self, shape, tape=None):
+    # render modes: when the board is printed
+    RENDER_NONE  = "none"  # never (headless)
+    RENDER_FINAL = "final" # once, when the game is over
+    RENDER_EVERY = "every" # after every <every>-th tile drawn
+    RENDER_FPS   = "fps"   # at most <fps> times per second
+    RENDER_MODES = (RENDER_NONE, RENDER_FINAL, RENDER_EVERY, RENDER_FPS)
+
+    def __init__(self, shape, tape=None, render=RENDER_EVERY, every=1, fps=25):
+        """
+        render, every, fps -- when to print the board, see RENDER_*. By
+        default, the board is printed after every tile drawn. How it is
+        printed is up to the renderer (see TerminalRenderer), the whole board
+        is printed if there is none.
+        """
+        if render not in self.RENDER_MODES:
+            raise ValueError(f"Unknown render mode: {render}")
         self.w = shape[0] # width
         self.h = shape[1] # height
         self.board = np.zeros((self.h, self.w), dtype=np.int8) 
         self.verbose = False
         self.score = 0
 
+        self.render = render
+        self.every = every
+        self.fps = fps
+        self.frames = 0       # number of tiles drawn
+        self.rendered = 0     # number of times the board has been printed
+        self._rendered_at = None # time the board was last printed (RENDER_FPS)
+        self._dirty = False   # the board has changed since it was last printed
+        # text of the board: a row of figures and a newline per line of the board
+        self._text = np.full((self.h, self.w + 1), ord('\n'), dtype=np.uint8)
+
         self.paddle = None # position of the paddle
         self.ball   = None # position of the ball
         
         if tape:
-            self.inputs = []
+            self.inputs = Channel()
             self.computer = Interpreter(tape)
             self.computer.set_uplink_to(self)
 
         self._player = None
+        self._renderer = None
 
         self.figures = {
             self.EMPTY  : '.', # 0 is an empty tile. No game object appears in this tile.
@@ -38,6 +65,10 @@ class Game(object):
             self.PADDLE : '=', # 3 is a horizontal paddle tile. The paddle is indestructible.
             self.BALL   : 'o', # 4 is a ball tile. The ball moves diagonally and bounces off objects.
         }
+        # ASCII codes of figures indexed by tile, see __str__
+        self._table = np.zeros(max(self.figures) + 1, dtype=np.uint8)
+        for tile, figure in self.figures.items():
+            self._table[tile] = ord(figure)
 
     @property
     def player(self):
@@ -49,22 +80,81 @@ class Game(object):
         self._player.game = self
         self.computer.inputs = self._player.outputs
 
+    @property
+    def renderer(self):
+        return self._renderer
+
+    @renderer.setter
+    def renderer(self, renderer):
+        self._renderer = renderer
+        if renderer is not None:
+            renderer.game = self
+
     def execute(self):
-        while not self.computer.finished:
-            self.computer.execute()
-            if len(self.inputs) == 3:
+        computer = self.computer
+        while True:
+            reason = computer.run_until(outputs=3)
+            if reason == computer.OUTPUTS:
                 self._execute()
+            elif reason == computer.INPUT_NEEDED:
+                # nobody has provided the joystick position, the computer
+                # asks for it on stdin
+                computer.step()
+            elif reason == computer.HALTED:
+                break
+        self._final_frame()
+
+    def run(self):
+        """
+        Same as execute(), but drives the computer as a generator (see
+        Interpreter.run()) instead of collecting its outputs in the inputs
+        of the game.
+
+        >>> game = Game((2, 1), Tape("104,1,104,0,104,4,99"), render=Game.RENDER_FINAL)
+        >>> game.run()
+        .o
+        SCORE: 0; PADDLE: None; BALL: (0, 1)
+        >>> Game((2, 2), Tape("99"), render=Game.RENDER_NONE).run()
+        """
+        program = self.computer.run()
+        command = []
+        try:
+            value = next(program)
+            while True:
+                if value is None:
+                    # nobody has provided the joystick position
+                    print("Please input an integer:")
+                    value = program.send(int(sys.stdin.readline().strip()))
+                else:
+                    command.append(value)
+                    if len(command) == 3:
+                        self._process(*command)
+                        command = []
+                    value = next(program)
+        except StopIteration:
+            pass
+        self._final_frame()
 
     def _execute(self):
         """
         Low level method that interprets commands in the input buffer
         """
-        arg1 = self.inputs.pop(0)
-        arg2 = self.inputs.pop(0)
-        arg3 = self.inputs.pop(0)
-    
+        self._process(*self.inputs.drain(3))
+
+    def _process(self, arg1, arg2, arg3):
+        """
+        Interpret one command: draw a tile or update the score
+
+        >>> game = Game((2, 1), render=Game.RENDER_FINAL)
+        >>> game._process(0, 0, Game.BALL)
+        >>> game._process(-1, 0, 42)
+        >>> game._final_frame()
+        o.
+        SCORE: 42; PADDLE: None; BALL: (0, 0)
+        """
         if arg1 == -1 and arg2 == 0:
             self.score = arg3
+            self._dirty = True
         else:
             self.draw(arg1, arg2, arg3)
             if self.player:
@@ -84,14 +174,54 @@ class Game(object):
         if tile == self.BALL:
             self.ball = (y,x)
 
-        print(self)
+        self.frames += 1
+        self._dirty = True
+        if self._renderer is not None:
+            self._renderer.changed(y, x)
+        if self.render == self.RENDER_EVERY:
+            if self.frames % self.every == 0:
+                self.show()
+        elif self.render == self.RENDER_FPS:
+            now = time.perf_counter()
+            if self._rendered_at is None or now - self._rendered_at >= 1 / self.fps:
+                self._rendered_at = now
+                self.show()
+
+    def show(self):
+        """
+        Print the board
+        """
+        if self._renderer is None:
+            print(self)
+        else:
+            self._renderer.render()
+        self.rendered += 1
+        self._dirty = False
+
+    def _final_frame(self):
+        """
+        Print the board when the game is over, unless it has not changed since
+        it was last printed
+        """
+        if self.render != self.RENDER_NONE and self._dirty:
+            self.show()
 
     def __str__(self):
-        lines = []
-        for row in self.board:
-            lines.append("".join([self.figures[c] for c in row]))
-        lines.append(f"SCORE: {self.score}; PADDLE: {self.paddle}; BALL: {self.ball}")
-        return "\n".join(lines)
+        """
+        Figures of the whole board are looked up at once, by indexing the
+        table of figures with the board
+
+        >>> game = Game((3, 2))
+        >>> game.board[0] = [Game.WALL, Game.EMPTY, Game.BLOCK]
+        >>> game.board[1] = [Game.EMPTY, Game.BALL, Game.PADDLE]
+        >>> print(game)
+        W.B
+        .o=
+        SCORE: 0; PADDLE: None; BALL: None
+        """
+        self._text[:, :self.w] = self._table[self.board]
+        status = f"SCORE: {self.score}; PADDLE: {self.paddle}; BALL: {self.ball}"
+        return self._text.tobytes().decode("ascii") + status
 
     def _vprint(self, msg):
         if self.verbose:
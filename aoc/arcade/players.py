@@ -1,3 +1,9 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from intcode import Channel
+
 
 class PlayerFollower(object):
     """
@@ -8,7 +14,7 @@ class PlayerFollower(object):
 
     def __init__(self, game=None):
         self.game = game
-        self.outputs = []
+        self.outputs = Channel()
         self.ball = None
         self.after_first_bounce = False
     
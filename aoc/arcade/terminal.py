@@ -0,0 +1,134 @@
+
+import sys
+import time
+
+class TerminalRenderer(object):
+    """
+    Renderer of a Game on an ANSI terminal that redraws only what has changed.
+
+    The first frame clears the screen and draws the whole board. Later frames
+    move the cursor (ESC[row;colH) to cells that have changed since the last
+    frame and write only them, adjacent cells in a row at once, and rewrite
+    the score line only if the score has changed. The Game tells the renderer
+    which cells its draw() has touched; cells drawn with the tile they already
+    had are not written.
+
+        game = Game((45,20), tape, render=Game.RENDER_FPS, fps=30)
+        game.renderer = TerminalRenderer()
+
+    Statistics of rendering are in <stats>: frames, cells written, bytes
+    written, seconds spent and frames_per_second.
+
+    >>> import io
+    >>> from .game import Game
+    >>> screen = io.StringIO()
+    >>> game = Game((3, 2))
+    >>> game.renderer = TerminalRenderer(screen)
+    >>> game.draw(0, 0, Game.WALL)
+    >>> screen.getvalue()
+    '\\x1b[2J\\x1b[HW..\\n...\\n\\x1b[3;1H\\x1b[2KSCORE: 0\\x1b[4;1H'
+    >>> _ = screen.seek(0), screen.truncate()
+    >>> game.draw(1, 1, Game.BALL)
+    >>> game.draw(2, 1, Game.PADDLE)
+    >>> game.draw(0, 0, Game.WALL)
+    >>> screen.getvalue()
+    '\\x1b[2;2Ho\\x1b[4;1H\\x1b[2;3H=\\x1b[4;1H\\x1b[4;1H'
+    >>> game.renderer.stats["frames"], game.renderer.stats["cells"]
+    (4, 8)
+
+    A score update marks the board as changed too: when it is the last event
+    of the game, the final frame rewrites the score line
+
+    >>> _ = screen.seek(0), screen.truncate()
+    >>> game._process(-1, 0, 42)
+    >>> game._final_frame()
+    >>> screen.getvalue()
+    '\\x1b[3;1H\\x1b[2KSCORE: 42\\x1b[4;1H'
+    """
+
+    CLEAR = "\x1b[2J\x1b[H"   # clear the screen, cursor to the top left corner
+    CLEAR_LINE = "\x1b[2K"
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.stats = {"frames": 0, "cells": 0, "bytes": 0, "seconds": 0.0,
+                      "frames_per_second": 0.0}
+        self._game = None
+        self._shown = None  # the board as it is on the screen
+        self._score = None  # the score on the screen
+        self._changed = set() # (y, x) cells drawn since the last frame
+
+    @property
+    def game(self):
+        return self._game
+
+    @game.setter
+    def game(self, game):
+        self._game = game
+        self._shown = None
+        self._score = None
+        self._changed = set()
+
+    def changed(self, y, x):
+        """
+        Called by the game when it draws a tile at (y, x)
+        """
+        self._changed.add((y, x))
+
+    def render(self):
+        """
+        Write the changes since the last frame to the terminal
+        """
+        started = time.perf_counter()
+        game = self._game
+        if self._shown is None:
+            parts = [self.CLEAR, self._full_board()]
+            cells = game.board.size
+            self._shown = game.board.copy()
+        else:
+            parts, cells = self._changes()
+        self._changed = set()
+
+        if game.score != self._score:
+            # the score line is right under the board
+            parts.append(f"\x1b[{game.h + 1};1H{self.CLEAR_LINE}SCORE: {game.score}")
+            self._score = game.score
+        # park the cursor under the board
+        parts.append(f"\x1b[{game.h + 2};1H")
+
+        text = "".join(parts)
+        self.stream.write(text)
+        self.stream.flush()
+
+        stats = self.stats
+        stats["frames"] += 1
+        stats["cells"] += cells
+        stats["bytes"] += len(text)
+        stats["seconds"] += time.perf_counter() - started
+        if stats["seconds"]:
+            stats["frames_per_second"] = stats["frames"] / stats["seconds"]
+
+    def _full_board(self):
+        # the text of the board without the status line, see Game.__str__
+        text = str(self._game)
+        return text[:text.rindex("\n") + 1]
+
+    def _changes(self):
+        """
+        Cursor movements and figures of cells that differ from the screen,
+        adjacent cells in a row written after one movement.
+        """
+        board, shown, figures = self._game.board, self._shown, self._game.figures
+        cells = sorted(cell for cell in self._changed if board[cell] != shown[cell])
+        parts = []
+        run_y, run_x, run = None, None, []
+        for y, x in cells:
+            if y != run_y or x != run_x + len(run):
+                if run:
+                    parts.append(f"\x1b[{run_y + 1};{run_x + 1}H{''.join(run)}")
+                run_y, run_x, run = y, x, []
+            run.append(figures[board[y, x]])
+            shown[y, x] = board[y, x]
+        if run:
+            parts.append(f"\x1b[{run_y + 1};{run_x + 1}H{''.join(run)}")
+        return parts, len(cells)
@@ -1,2 +1,5 @@
 from .tape import Tape
+from .channel import Channel, ChannelFull
 from .interpreter import Interpreter
+from .fast_interpreter import FastInterpreter
+from .batch import BatchInterpreter
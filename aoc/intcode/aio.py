@@ -0,0 +1,221 @@
+"""
+Networks of Intcode machines on asyncio.
+
+Every machine of a Network runs as an asyncio task. The task executes the
+program in quanta of at most <quantum> instructions (see run_until()) and
+gives other tasks a chance to run after each quantum. A machine that needs
+input and has none, or that writes to a full channel, waits until another
+machine writes to its inputs or drains its outputs.
+
+Machines are connected by Channels: the outputs of one machine are the
+inputs of another one.
+
+    net = Network(quantum=1000)
+    for name, phase in zip("ABCDE", phases):
+        net.add(FastInterpreter(Tape(tape), inputs=[phase]), name)
+    for src, dst in zip("ABCDE", "BCDEA"):
+        net.connect(src, dst)
+    net.send("A", 0)
+    net.execute()
+
+When all machines that have not halted are waiting, the network is idle. The
+function <on_idle>, if given, is then called with the network and may wake
+machines up by sending them inputs. If nothing has been sent, the network is
+deadlocked: it stops and the names of the waiting machines are listed in
+<deadlocked>.
+"""
+
+import asyncio
+import time
+
+from .channel import Channel
+from .interpreter import Interpreter
+
+class Network(object):
+    """
+    Amplifiers of day 7 connected in a feedback loop
+
+    >>> from .fast_interpreter import FastInterpreter
+    >>> s = "3,26,1001,26,-4,26,3,27,1002,27,2,27,1,27,26,27,4,27,1001,28,-1,28,1005,28,6,99,0,0,5"
+    >>> net = Network(quantum=10)
+    >>> for name, phase in zip("ABCDE", [9, 8, 7, 6, 5]):
+    ...     _ = net.add(FastInterpreter(s, inputs=[phase]), name)
+    >>> for src, dst in zip("ABCDE", "BCDEA"):
+    ...     net.connect(src, dst)
+    >>> net.send("A", 0)
+    >>> net.execute()
+    >>> net.machines["A"].inputs, net.deadlocked
+    (Channel([139629729]), [])
+    >>> net.stats["E"]["steps"], net.totals["steps"]
+    (33, 165)
+
+    Machines that wait for each other are reported
+
+    >>> net = Network()
+    >>> _ = net.add(FastInterpreter("3,10,4,10,99"), "ping")
+    >>> _ = net.add(FastInterpreter("3,10,4,10,99"), "pong")
+    >>> net.connect("ping", "pong")
+    >>> net.connect("pong", "ping")
+    >>> net.execute()
+    >>> net.deadlocked
+    ['ping', 'pong']
+
+    unless somebody wakes them up when the network is idle
+
+    >>> def kick(net):
+    ...     if not net.machines["ping"].finished:
+    ...         net.send("ping", 42)
+    >>> net = Network(on_idle=kick)
+    >>> _ = net.add(FastInterpreter("3,10,4,10,99"), "ping")
+    >>> _ = net.add(FastInterpreter("3,10,4,10,99"), "pong")
+    >>> net.connect("ping", "pong")
+    >>> net.execute()
+    >>> net.machines["pong"].outputs, net.deadlocked
+    (Channel([42]), [])
+    """
+
+    def __init__(self, quantum=1000, on_idle=None):
+        self.quantum = quantum # max number of instructions a machine executes at once
+        self.on_idle = on_idle
+        self.machines = {}     # name -> computer
+        self.stats = {}        # name -> statistics of the machine
+        self.totals = {}       # statistics of the whole network
+        self.deadlocked = []   # names of machines waiting forever
+
+        self._events = {}      # name -> asyncio.Event that wakes the machine up
+        self._waiting = {}     # name -> reason the machine is waiting for
+        self._readers = {}     # id of a channel -> names of machines reading it
+        self._writers = {}     # id of a channel -> names of machines writing to it
+        self._alive = 0
+        self._stopped = False
+
+    def add(self, computer, name=None):
+        """
+        Add given <computer> to the network under given <name> (by default,
+        its device_id or its number). Inputs and outputs of the computer
+        become Channels. Returns the name.
+        """
+        if name is None:
+            name = len(self.machines) if computer.device_id is None else computer.device_id
+        if name in self.machines:
+            raise ValueError(f"Machine {name} is already in the network")
+
+        if not hasattr(computer.inputs, "popleft"):
+            computer.inputs = Channel(computer.inputs or ())
+        if not hasattr(computer.outputs, "popleft"):
+            computer.outputs = Channel(computer.outputs or ())
+
+        self.machines[name] = computer
+        return name
+
+    def connect(self, src, dst):
+        """
+        Direct outputs of machine <src> to inputs of machine <dst>.
+        """
+        self.machines[src].outputs = self.machines[dst].inputs
+
+    def send(self, name, *values):
+        """
+        Add <values> to inputs of machine <name> and wake it up if it waits
+        for input. Can be called while the network is running.
+        """
+        self.machines[name].inputs.extend(values)
+        self._wake_readers(self.machines[name].inputs)
+
+    def execute(self):
+        """
+        Run the network until all machines halt or it deadlocks.
+        """
+        asyncio.run(self.run())
+
+    async def run(self):
+        """
+        Coroutine that runs the network, see execute().
+        """
+        self._events = {name: asyncio.Event() for name in self.machines}
+        self._waiting = {}
+        self._readers = {}
+        self._writers = {}
+        for name, computer in self.machines.items():
+            self._readers.setdefault(id(computer.inputs), []).append(name)
+            self._writers.setdefault(id(computer.outputs), []).append(name)
+            self.stats[name] = {"steps": 0, "quanta": 0, "waits": 0,
+                                "seconds": 0.0, "steps_per_second": 0.0}
+        self._alive = len(self.machines)
+        self._stopped = False
+        self.deadlocked = []
+
+        started = time.perf_counter()
+        await asyncio.gather(*[self._run_machine(name) for name in self.machines])
+        elapsed = time.perf_counter() - started
+
+        steps = sum(stats["steps"] for stats in self.stats.values())
+        self.totals = {"machines": len(self.machines), "steps": steps,
+                       "seconds": elapsed,
+                       "steps_per_second": steps / elapsed if elapsed else 0.0}
+
+    async def _run_machine(self, name):
+        computer = self.machines[name]
+        stats = self.stats[name]
+        event = self._events[name]
+
+        while not self._stopped:
+            num_steps = computer.num_steps
+            started = time.perf_counter()
+            reason = computer.run_until(steps=self.quantum)
+            stats["seconds"] += time.perf_counter() - started
+            stats["steps"] += computer.num_steps - num_steps
+            stats["quanta"] += 1
+            if stats["seconds"]:
+                stats["steps_per_second"] = stats["steps"] / stats["seconds"]
+
+            self._wake_readers(computer.outputs)
+            self._wake_writers(computer.inputs)
+
+            if reason == computer.HALTED:
+                self._alive -= 1
+                self._check_idle()
+                break
+
+            if reason == computer.INPUT_NEEDED or reason == computer.BLOCKED:
+                stats["waits"] += 1
+                event.clear()
+                self._waiting[name] = reason
+                self._check_idle()
+                await event.wait()
+            else:
+                await asyncio.sleep(0)
+
+    def _wake(self, name):
+        del self._waiting[name]
+        self._events[name].set()
+
+    def _wake_readers(self, channel):
+        if channel:
+            for name in self._readers.get(id(channel), ()):
+                if self._waiting.get(name) == Interpreter.INPUT_NEEDED:
+                    self._wake(name)
+
+    def _wake_writers(self, channel):
+        if not getattr(channel, "full", False):
+            for name in self._writers.get(id(channel), ()):
+                if self._waiting.get(name) == Interpreter.BLOCKED:
+                    self._wake(name)
+
+    def _check_idle(self):
+        """
+        Detect the network being idle: all machines that have not halted wait.
+        """
+        if len(self._waiting) < self._alive:
+            return
+
+        if self._alive and self.on_idle is not None:
+            self.on_idle(self)
+            if len(self._waiting) < self._alive:
+                return
+
+        if self._alive:
+            self.deadlocked = sorted(self._waiting, key=str)
+        self._stopped = True
+        for name in list(self._waiting):
+            self._wake(name)
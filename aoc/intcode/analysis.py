@@ -0,0 +1,348 @@
+"""
+Static analysis of Intcode programs.
+
+ControlFlowGraph disassembles the program on a tape without running it. It
+follows the code from the entry point, both ways at every conditional jump,
+so that data that is never executed is not mistaken for code. Parameters are
+shown according to their modes as the interpreter reads them (see
+decoder.format_instruction): [address], immediate value or [rb+offset].
+
+Jumps whose target is read from memory (usually returns from subroutines
+through the relative base) can not be followed statically. Instead, the
+addresses right after unconditional jumps that appear as immediate values in
+the program (return addresses pushed by callers) are taken as additional
+entry points.
+
+The code is split into basic blocks, connected by edges:
+  jump -- the jump is taken
+  fall -- execution continues at the next instruction
+  return -- from a jump to a subroutine to its return address
+Blocks ending with a jump to an unknown target are marked as indirect.
+
+The graph also lists
+  loops  -- natural loops: the header block and blocks of the body
+  io     -- addresses of input and output instructions
+  writes -- instructions that write into code: (address, target address),
+            known only for writes in position mode
+
+    cfg = ControlFlowGraph(Tape.read_from_file("input.txt"))
+    print(cfg)
+    print(cfg.to_dot())
+"""
+
+from collections import namedtuple
+
+from .tape import Tape
+from .decoder import DECODE_TABLE, WRITES, IMMEDIATE, POSITIONAL, format_instruction
+
+class Op(namedtuple("Op", ["address", "opcode", "modes", "params", "word"])):
+    """
+    Disassembled instruction at <address> with its raw <params>, <word> is
+    the instruction word as it is in the program.
+
+    >>> op = Op(10, 5, (1, 1, 0), (1, 4), 1105)
+    >>> op, op.next, op.target, op.always
+    (10: JUMP-IF-TRUE 1, 4, 13, 4, True)
+    >>> Op(0, 99, (2, 2, 2), (), 22299).words
+    (22299,)
+    """
+
+    __slots__ = ()
+
+    @property
+    def next(self):
+        """Address of the instruction that follows"""
+        return self.address + 1 + len(self.params)
+
+    @property
+    def is_jump(self):
+        return self.opcode in (5, 6)
+
+    @property
+    def is_io(self):
+        return self.opcode in (3, 4)
+
+    @property
+    def target(self):
+        """Address the jump goes to, None if not known statically"""
+        if self.is_jump and self.modes[1] == IMMEDIATE:
+            return self.params[1]
+        return None
+
+    @property
+    def always(self):
+        """True if the jump is always taken"""
+        if not self.is_jump or self.modes[0] != IMMEDIATE:
+            return False
+        return (self.params[0] != 0) == (self.opcode == 5)
+
+    @property
+    def writes_to(self):
+        """Address the instruction writes to, None if not known statically"""
+        pos = WRITES.get(self.opcode)
+        if pos is not None and self.modes[pos] == POSITIONAL:
+            return self.params[pos]
+        return None
+
+    @property
+    def words(self):
+        return (self.word,) + self.params
+
+    def text(self):
+        return format_instruction(self.words)
+
+    def __repr__(self):
+        return f"{self.address}: {self.text()}"
+
+class BasicBlock(object):
+    def __init__(self, start):
+        self.start = start
+        self.ops = []
+        self.edges = []     # (target block start, kind)
+        self.indirect = False
+
+    @property
+    def end(self):
+        """Address right after the last instruction of the block"""
+        return self.ops[-1].next
+
+    def __repr__(self):
+        return f"BasicBlock({self.start}..{self.end - 1})"
+
+class ControlFlowGraph(object):
+    """
+    >>> s = "1101,0,3,20,4,20,1001,20,-1,20,1005,20,4,99,0,0"
+    >>> cfg = ControlFlowGraph(s)
+    >>> cfg.blocks
+    {0: BasicBlock(0..3), 4: BasicBlock(4..12), 13: BasicBlock(13..13)}
+    >>> cfg.blocks[4].edges
+    [(4, 'jump'), (13, 'fall')]
+    >>> cfg.loops, cfg.io
+    ([(4, [4])], [4])
+    >>> print(cfg)
+    block 0
+           0  1101,0,3,20          SUM 0, 3, [20]
+        -> 4 fall
+    block 4, loop header
+           4  4,20                 OUTPUT [20]              ; io
+           6  1001,20,-1,20        SUM [20], -1, [20]
+          10  1005,20,4            JUMP-IF-TRUE [20], 4
+        -> 4 jump
+        -> 13 fall
+    block 13
+          13  99                   HALT
+    data
+          14  0,0
+
+    Writes into code are detected, relative jumps are followed to return
+    addresses pushed before calls
+
+    >>> s = "1101,0,99,8,21101,0,11,0,1105,1,14,4,0,99,2106,0,0"
+    >>> cfg = ControlFlowGraph(s)
+    >>> cfg.writes
+    [(0, 8)]
+    >>> sorted(cfg.blocks), cfg.blocks[14].indirect
+    ([0, 11, 14], True)
+    >>> print(cfg.to_dot())
+    digraph ControlFlowGraph {
+    "0" [shape=box, label="0: SUM 0, 99, [8]\\l4: SUM 0, 11, [rb+0]\\l8: JUMP-IF-TRUE 1, 14\\l"];
+    "11" [shape=box, style=bold, label="11: OUTPUT [0]\\l13: HALT\\l"];
+    "14" [shape=box, label="14: JUMP-IF-FALSE 0, [rb+0]\\l"];
+    "0" -> "14" [label="jump"];
+    "0" -> "11" [label="return"];
+    "14" -> "?" [style=dashed];
+    }
+    """
+
+    def __init__(self, tape, entries=(0,)):
+        tape = Tape(tape) if isinstance(tape, str) else tape
+        self.words = list(tape.cells)
+        self.ops = {}       # address -> Op
+        self.entries = list(entries)
+        self.blocks = {}    # start address -> BasicBlock
+        self.loops = []     # (header, [starts of blocks in the body])
+        self.io = []        # addresses of input and output instructions
+        self.writes = []    # (address of instruction, address of code it writes to)
+        self._returns = set() # return addresses found in the code
+
+        self._disassemble()
+        self._build_blocks()
+        self._find_loops()
+
+        covered = {addr for op in self.ops.values()
+                        for addr in range(op.address, op.next)}
+        for addr, op in sorted(self.ops.items()):
+            if op.is_io:
+                self.io.append(addr)
+            if op.writes_to in covered:
+                self.writes.append((addr, op.writes_to))
+
+    def _decode(self, addr):
+        words = self.words
+        word = words[addr]
+        instr = DECODE_TABLE[word] if 0 <= word < len(DECODE_TABLE) else None
+        if instr is None or addr + instr.arity >= len(words):
+            return None
+        params = tuple(words[addr+1:addr+1+instr.arity])
+        return Op(addr, instr.opcode, instr.modes, params, word)
+
+    def _disassemble(self):
+        """
+        Decode instructions reachable from entry points.
+        """
+        todo = list(self.entries)
+        while todo:
+            self._follow(todo)
+            # return addresses: immediate values right after unconditional jumps
+            returns = {op.next for op in self.ops.values() if op.always}
+            for op in list(self.ops.values()):
+                for p, m in zip(op.params, op.modes):
+                    if m == IMMEDIATE and p in returns and p not in self._returns:
+                        self._returns.add(p)
+                        if p not in self.ops:
+                            self.entries.append(p)
+                            todo.append(p)
+
+    def _follow(self, todo):
+        ops = self.ops
+        while todo:
+            addr = todo.pop()
+            while addr not in ops and 0 <= addr < len(self.words):
+                op = self._decode(addr)
+                if op is None:
+                    break
+                ops[addr] = op
+                if op.opcode == 99:
+                    break
+                if op.is_jump:
+                    if op.target is not None:
+                        todo.append(op.target)
+                    if op.always:
+                        break
+                addr = op.next
+
+    def _build_blocks(self):
+        leaders = set(self.entries)
+        for op in self.ops.values():
+            if op.is_jump or op.opcode == 99:
+                leaders.add(op.next)
+                if op.target is not None:
+                    leaders.add(op.target)
+
+        block = None
+        for addr in sorted(self.ops):
+            op = self.ops[addr]
+            if block is None or addr in leaders or block.end != addr:
+                block = self.blocks[addr] = BasicBlock(addr)
+            block.ops.append(op)
+            if op.is_jump or op.opcode == 99:
+                block = None
+
+        for block in self.blocks.values():
+            last = block.ops[-1]
+            if last.opcode == 99:
+                continue
+            if last.is_jump:
+                if last.target is None:
+                    block.indirect = True
+                elif last.target in self.blocks:
+                    block.edges.append((last.target, "jump"))
+                if last.always:
+                    if last.next in self._returns and last.next in self.blocks:
+                        block.edges.append((last.next, "return"))
+                    continue
+            if last.next in self.blocks:
+                block.edges.append((last.next, "fall"))
+
+    def _find_loops(self):
+        """
+        Find natural loops: a back edge u -> h of depth first search, where h
+        is on the stack, makes a loop with header h and the body of all blocks
+        that reach u without passing through h.
+        """
+        preds = {start: [] for start in self.blocks}
+        for block in self.blocks.values():
+            for target, _ in block.edges:
+                preds[target].append(block.start)
+
+        back_edges = []
+        visited, on_stack = set(), set()
+        for root in self.entries:
+            if root not in self.blocks or root in visited:
+                continue
+            stack = [(root, iter(self.blocks[root].edges))]
+            visited.add(root)
+            on_stack.add(root)
+            while stack:
+                node, edges = stack[-1]
+                for target, _ in edges:
+                    if target in on_stack:
+                        back_edges.append((node, target))
+                    elif target not in visited:
+                        visited.add(target)
+                        on_stack.add(target)
+                        stack.append((target, iter(self.blocks[target].edges)))
+                        break
+                else:
+                    stack.pop()
+                    on_stack.discard(node)
+
+        loops = {}
+        for tail, header in back_edges:
+            body = loops.setdefault(header, {header})
+            todo = [tail]
+            while todo:
+                node = todo.pop()
+                if node not in body:
+                    body.add(node)
+                    todo.extend(preds[node])
+        self.loops = [(header, sorted(body)) for header, body in sorted(loops.items())]
+
+    def __str__(self):
+        headers = {header for header, _ in self.loops}
+        lines = []
+        addr = 0
+        for start, block in sorted(self.blocks.items()):
+            if addr < start:
+                lines.extend(self._data_lines(addr, start))
+            title = f"block {start}"
+            if start in headers:
+                title += ", loop header"
+            if block.indirect:
+                title += ", indirect jump"
+            lines.append(title)
+            for op in block.ops:
+                words = ",".join(map(str, op.words))
+                comment = "; io" if op.is_io else ""
+                if op.writes_to is not None and (op.address, op.writes_to) in self.writes:
+                    comment = f"; writes into code at {op.writes_to}"
+                lines.append(f"    {op.address:4}  {words:20} {op.text():24} {comment}".rstrip())
+            for target, kind in block.edges:
+                lines.append(f"    -> {target} {kind}")
+            addr = block.end
+        if addr < len(self.words):
+            lines.extend(self._data_lines(addr, len(self.words)))
+        return "\n".join(lines)
+
+    def _data_lines(self, start, end, per_line=10):
+        lines = ["data"]
+        for addr in range(start, end, per_line):
+            words = self.words[addr:min(end, addr + per_line)]
+            lines.append(f"    {addr:4}  {','.join(map(str, words))}")
+        return lines
+
+    def to_dot(self):
+        headers = {header for header, _ in self.loops}
+        lines = ["digraph ControlFlowGraph {"]
+        for start, block in sorted(self.blocks.items()):
+            label = "".join(f"{op!r}\\l" for op in block.ops)
+            style = ", style=bold" if any(op.is_io for op in block.ops) else ""
+            shape = "doubleoctagon" if start in headers else "box"
+            lines.append(f"\"{start}\" [shape={shape}{style}, label=\"{label}\"];")
+        for start, block in sorted(self.blocks.items()):
+            for target, kind in block.edges:
+                lines.append(f"\"{start}\" -> \"{target}\" [label=\"{kind}\"];")
+            if block.indirect:
+                lines.append(f"\"{start}\" -> \"?\" [style=dashed];")
+        lines.append("}")
+        return "\n".join(lines)
@@ -0,0 +1,142 @@
+"""
+ASCII text I/O of Intcode programs.
+
+Programs of day 17 (and later days) read their commands as ASCII codes and
+output text the same way, one code per instruction. Encoding and decoding here
+work on whole strings: text is converted with str.encode/bytes.decode in one
+call instead of ord()/chr() per character.
+
+    send_lines(computer.inputs, ["A,B,C", "R,8,L,6", "n"])
+    decoder = AsciiDecoder()
+    decoder.feed(computer.outputs)
+    for frame in decoder.frames():
+        print(frame)
+
+Programs may also output values that are not ASCII codes (e.g. the amount of
+dust the robot has collected on day 17). Decoding separates them from the
+text, they are collected in order in <values>.
+"""
+
+def encode(text):
+    """
+    ASCII codes of the characters of <text>. Raise ValueError (a
+    UnicodeEncodeError) if there is a non-ASCII character.
+
+    >>> encode("R,8\\n")
+    [82, 44, 56, 10]
+    """
+    return list(text.encode("ascii"))
+
+def encode_lines(lines):
+    """
+    ASCII codes of <lines>, each line terminated by a newline.
+
+    >>> encode_lines(["A,B", "n"])
+    [65, 44, 66, 10, 110, 10]
+    """
+    return encode("".join(f"{line}\n" for line in lines))
+
+def send(channel, text):
+    """
+    Append ASCII codes of <text> to <channel> (a Channel or a list).
+    """
+    channel.extend(encode(text))
+
+def send_lines(channel, lines):
+    """
+    Append ASCII codes of <lines>, each with a newline, to <channel>.
+
+    >>> from .channel import Channel
+    >>> ch = Channel()
+    >>> send_lines(ch, ["A", "R,8"])
+    >>> ch
+    Channel([65, 10, 82, 44, 56, 10])
+    """
+    channel.extend(encode_lines(lines))
+
+def decode(codes):
+    """
+    Decode output <codes> into text. Return the text and the list of values
+    that are not ASCII codes.
+
+    >>> decode([35, 46, 10])
+    ('#.\\n', [])
+    >>> decode([35, 10, 1063081, -1])
+    ('#\\n', [1063081, -1])
+    """
+    try:
+        return bytes(codes).decode("ascii"), []
+    except ValueError:
+        # some code is negative, above 255 (bytes) or above 127 (decode)
+        pass
+    text = bytes(c for c in codes if 0 <= c < 128).decode("ascii")
+    return text, [c for c in codes if not 0 <= c < 128]
+
+class AsciiDecoder(object):
+    """
+    Decoder of text output in parts, e.g. after every run of the computer.
+    Decoded text is buffered and taken out by complete lines or complete
+    frames (pictures that end with an empty line).
+
+    >>> decoder = AsciiDecoder()
+    >>> decoder.feed(encode("#.#\\n.#"))
+    >>> decoder.lines()
+    ['#.#']
+    >>> decoder.feed(encode(".\\n\\nMain:\\n") + [1063081])
+    >>> decoder.frames(), decoder.pending, decoder.values
+    (['.#.'], 'Main:\\n', [1063081])
+    >>> decoder.read(), decoder.pending
+    ('Main:\\n', '')
+    """
+
+    def __init__(self):
+        self.values = []  # non-ASCII values in the order of output
+        self._chunks = [] # decoded text not taken yet
+
+    def feed(self, codes):
+        """
+        Decode given <codes>. A Channel is drained.
+        """
+        if hasattr(codes, "drain"):
+            codes = codes.drain()
+        text, values = decode(codes)
+        if text:
+            self._chunks.append(text)
+        if values:
+            self.values.extend(values)
+
+    @property
+    def pending(self):
+        """
+        Decoded text that has not been taken yet.
+        """
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def read(self):
+        """
+        Take all decoded text.
+        """
+        text = self.pending
+        self._chunks = []
+        return text
+
+    def _take(self, separator):
+        parts = self.read().split(separator)
+        if parts[-1]:
+            self._chunks.append(parts[-1])
+        return parts[:-1]
+
+    def lines(self):
+        """
+        Take complete lines, without newlines.
+        """
+        return self._take("\n")
+
+    def frames(self):
+        """
+        Take complete frames: text up to an empty line, without the newlines
+        at the end.
+        """
+        return self._take("\n\n")
@@ -0,0 +1,207 @@
+"""
+Running many copies of one Intcode program in lockstep.
+
+BatchInterpreter holds memories of N instances of a program as rows of one 2-D
+array of 64-bit integers and executes one instruction of every running
+instance per step. Instances whose program counters point to the same
+instruction word are executed together with NumPy operations on whole columns
+of indices, so the cost of a step depends on the number of distinct
+instructions being executed rather than on the number of instances.
+
+Instances do not talk to anybody while running: every instance gets its list
+of inputs upfront and its outputs are collected. Values are 64-bit integers
+and arithmetic that overflows them wraps around silently.
+
+Memory is dense: every row is as long as the farthest address any instance
+has accessed. Programs with sparse memory (tapes with values far beyond the
+program, accesses farther than SPARSE_GAP beyond the end of memory) are
+rejected, they are better served by the other interpreters.
+"""
+
+import numpy as np
+
+from .tape import Tape, SPARSE_GAP
+from .decoder import DECODE_TABLE, POSITIONAL, RELATIVE
+
+class BatchInterpreter(object):
+    """
+    >>> s = "3,12,3,13,2,12,13,14,4,14,99,0,0,0,0"
+    >>> batch = BatchInterpreter(s, [[2, 3], [4, 5], [-1, 7]])
+    >>> batch.execute()
+    [[6], [20], [-7]]
+    >>> batch.finished
+    True
+
+    Instances may take different paths through the program
+
+    >>> s = "3,16,1008,16,8,17,1005,17,13,4,16,104,0,104,1,99,0,0"
+    >>> BatchInterpreter(s, [[7], [8]]).execute()
+    [[7, 0, 1], [1]]
+
+    Memory grows for instances that access far addresses, relative mode works
+
+    >>> s = "109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99"
+    >>> outputs = BatchInterpreter(s, [[], []]).execute()
+    >>> ",".join(map(str, outputs[1])) == s
+    True
+
+    >>> BatchInterpreter("3,0,99", [[]]).execute()
+    Traceback (most recent call last):
+    ...
+    ValueError: Instance 0 has run out of inputs at address 0
+
+    >>> tape = Tape("4,0,99")
+    >>> tape.write_to(10**6, 1)
+    >>> BatchInterpreter(tape, [[]])
+    Traceback (most recent call last):
+    ...
+    ValueError: The tape has sparse memory up to address 1000000
+    >>> BatchInterpreter("4,1000000,99", [[]]).execute()
+    Traceback (most recent call last):
+    ...
+    ValueError: Access to address 1000000 far beyond the end of memory (3)
+    """
+
+    def __init__(self, tape, inputs):
+        tape = Tape(tape) if isinstance(tape, str) else tape
+        cells = tape.cells
+        if len(tape) > len(cells):
+            raise ValueError(f"The tape has sparse memory up to address {len(tape) - 1}")
+        program = np.array(cells, dtype=np.int64)
+        n = len(inputs)
+
+        self.memory = np.tile(program, (n, 1))
+        self.pc = np.zeros(n, dtype=np.int64)
+        self.rb = np.zeros(n, dtype=np.int64)
+        self.halted = np.zeros(n, dtype=bool)
+
+        width = max([len(values) for values in inputs], default=0)
+        self.inputs = np.zeros((n, max(1, width)), dtype=np.int64)
+        for i, values in enumerate(inputs):
+            self.inputs[i, :len(values)] = values
+        self.num_inputs = np.array([len(values) for values in inputs], dtype=np.int64)
+        self.input_pos = np.zeros(n, dtype=np.int64)
+
+        self.outputs = [[] for _ in range(n)]
+        self.steps = 0   # lockstep iterations
+        self.groups = 0  # instructions executed as groups of instances
+
+    @property
+    def finished(self):
+        return bool(self.halted.all())
+
+    def execute(self):
+        """
+        Run all instances until they halt. Return the list of outputs of
+        each instance.
+        """
+        while True:
+            running = np.flatnonzero(~self.halted)
+            if len(running) == 0:
+                break
+            self.step(running)
+        return self.outputs
+
+    def step(self, running):
+        """
+        Execute the current instruction of instances with indices <running>.
+        """
+        words = self.memory[running, self.pc[running]]
+        self.steps += 1
+
+        if len(running) and (words == words[0]).all():
+            groups = [(words[0], running)]
+        else:
+            groups = [(w, running[words == w]) for w in np.unique(words)]
+
+        for word, group in groups:
+            instr = DECODE_TABLE[word] if 0 <= word < len(DECODE_TABLE) else None
+            if instr is None:
+                raise ValueError(f"Unknown opcode {word}")
+            self.groups += 1
+            self._execute(instr, group)
+
+    def _execute(self, instr, g):
+        op, modes = instr.opcode, instr.modes
+        pc = self.pc[g]
+
+        if op == 99:
+            self.halted[g] = True
+            return
+
+        if op == 3:
+            pos = self.input_pos[g]
+            empty = pos >= self.num_inputs[g]
+            if empty.any():
+                i = g[np.argmax(empty)]
+                raise ValueError(f"Instance {i} has run out of inputs at address {self.pc[i]}")
+            self._write(g, self._address(g, pc, 0, modes[0]), self.inputs[g, pos])
+            self.input_pos[g] = pos + 1
+            self.pc[g] = pc + 2
+            return
+
+        x = self._param(g, pc, 0, modes[0])
+
+        if op == 4:
+            for i, val in zip(g.tolist(), x.tolist()):
+                self.outputs[i].append(val)
+            self.pc[g] = pc + 2
+            return
+
+        if op == 9:
+            self.rb[g] += x
+            self.pc[g] = pc + 2
+            return
+
+        y = self._param(g, pc, 1, modes[1])
+
+        if op == 5:
+            self.pc[g] = np.where(x != 0, y, pc + 3)
+            return
+        if op == 6:
+            self.pc[g] = np.where(x == 0, y, pc + 3)
+            return
+
+        if   op == 1: val = x + y
+        elif op == 2: val = x * y
+        elif op == 7: val = (x < y).astype(np.int64)
+        else:         val = (x == y).astype(np.int64)
+
+        self._write(g, self._address(g, pc, 2, modes[2]), val)
+        self.pc[g] = pc + 4
+
+    def _raw(self, g, pc, k):
+        addr = pc + 1 + k
+        self._reserve(addr)
+        return self.memory[g, addr]
+
+    def _address(self, g, pc, k, mode):
+        addr = self._raw(g, pc, k)
+        if mode == RELATIVE:
+            addr = addr + self.rb[g]
+        if (addr < 0).any():
+            raise ValueError(f"Attempting to access memory at negative address: {addr.min()}")
+        return addr
+
+    def _param(self, g, pc, k, mode):
+        if mode == POSITIONAL or mode == RELATIVE:
+            addr = self._address(g, pc, k, mode)
+            self._reserve(addr)
+            return self.memory[g, addr]
+        return self._raw(g, pc, k)
+
+    def _write(self, g, addr, val):
+        self._reserve(addr)
+        self.memory[g, addr] = val
+
+    def _reserve(self, addr):
+        """
+        Extend memory of all instances to include given address(es) <addr>.
+        """
+        top = int(np.max(addr))
+        width = self.memory.shape[1]
+        if top >= width + SPARSE_GAP:
+            raise ValueError(f"Access to address {top} far beyond the end of memory ({width})")
+        if top >= width:
+            extra = max(top + 1 - width, width)
+            self.memory = np.pad(self.memory, ((0, 0), (0, extra)))
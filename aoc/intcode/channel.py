@@ -0,0 +1,110 @@
+"""
+I/O channels between Intcode computers and the devices they control.
+"""
+
+from collections import deque
+
+class ChannelFull(Exception):
+    pass
+
+class Channel(object):
+    """
+    FIFO buffer of values: pushing to the back and taking from the front are
+    O(1). A channel created with <capacity> holds at most that many values.
+    Pushing to a full channel raises ChannelFull, and an Interpreter that
+    outputs to a full channel suspends before the output instruction until
+    the reader drains the channel (backpressure).
+
+    >>> ch = Channel([1, 2])
+    >>> ch.push(3)
+    >>> ch.extend([4, 5])
+    >>> ch.popleft(), len(ch)
+    (1, 4)
+    >>> ch.drain(2), ch.drain()
+    ([2, 3], [4, 5])
+    >>> bool(ch)
+    False
+
+    >>> ch = Channel(capacity=2)
+    >>> ch.extend([1, 2])
+    >>> ch.full
+    True
+    >>> ch.push(3)
+    Traceback (most recent call last):
+    ...
+    aoc.intcode.channel.ChannelFull: channel of capacity 2 is full
+    >>> ch
+    Channel([1, 2], capacity=2)
+    """
+
+    def __init__(self, values=(), capacity=None):
+        self.capacity = capacity
+        self._queue = deque()
+        self.extend(values)
+
+    @property
+    def full(self):
+        return self.capacity is not None and len(self._queue) >= self.capacity
+
+    def push(self, value):
+        if self.full:
+            raise ChannelFull(f"channel of capacity {self.capacity} is full")
+        self._queue.append(value)
+
+    # lets a channel be used where a list of outputs is expected
+    append = push
+
+    def extend(self, values):
+        if self.capacity is None:
+            self._queue.extend(values)
+        else:
+            for value in values:
+                self.push(value)
+
+    def popleft(self):
+        """
+        Take the value from the front of the channel.
+        Raise IndexError if the channel is empty.
+        """
+        return self._queue.popleft()
+
+    def drain(self, n=None):
+        """
+        Take <n> values (all values if n is None) from the front of the channel
+        and return them as a list.
+        """
+        queue = self._queue
+        if n is None or n >= len(queue):
+            values = list(queue)
+            queue.clear()
+        else:
+            values = [queue.popleft() for _ in range(n)]
+        return values
+
+    def clear(self):
+        self._queue.clear()
+
+    def copy(self):
+        return Channel(self._queue, self.capacity)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __bool__(self):
+        return len(self._queue) > 0
+
+    def __iter__(self):
+        return iter(self._queue)
+
+    def __getitem__(self, idx):
+        return self._queue[idx]
+
+    def __eq__(self, other):
+        if isinstance(other, Channel):
+            return list(self._queue) == list(other._queue)
+        return list(self._queue) == other
+
+    def __repr__(self):
+        if self.capacity is None:
+            return f"Channel({list(self._queue)})"
+        return f"Channel({list(self._queue)}, capacity={self.capacity})"
@@ -0,0 +1,144 @@
+"""
+Decoding of Intcode instruction words.
+
+An instruction word packs the opcode into the two rightmost digits and the
+parameter modes into the digits to the left of it, the mode of the first
+parameter being the hundreds digit:
+
+    ABCDE
+     1002
+    DE -- two-digit opcode,      02 == opcode 2
+     C -- mode of 1st parameter,  0 == position mode
+     B -- mode of 2nd parameter,  1 == immediate mode
+     A -- mode of 3rd parameter,  0 == position mode (omitted leading zero)
+
+Since there are only few legal instruction words (the largest one is 22299),
+all of them are decoded once, at import time, into the table DECODE_TABLE that
+maps an instruction word to its Instruction record. The interpreter then
+decodes an instruction by indexing the table.
+"""
+
+from collections import namedtuple
+from itertools import product
+
+# opcode -> number of parameters the instruction takes
+ARITY = {
+    1: 3,  # sum
+    2: 3,  # multiply
+    3: 1,  # read input
+    4: 1,  # output
+    5: 2,  # jump if true
+    6: 2,  # jump if false
+    7: 3,  # less than
+    8: 3,  # equals
+    9: 1,  # adjust relative base
+    99: 0, # halt
+}
+
+MNEMONICS = {
+    1: "SUM",
+    2: "MULTIPLY",
+    3: "READ-INPUT",
+    4: "OUTPUT",
+    5: "JUMP-IF-TRUE",
+    6: "JUMP-IF-FALSE",
+    7: "IFLT",
+    8: "IFEQ",
+    9: "ADJUST-REL-BASE",
+    99: "HALT",
+}
+
+# opcode -> index of the parameter that is the address to write the result to
+WRITES = {1: 2, 2: 2, 3: 0, 7: 2, 8: 2}
+
+# parameter modes
+POSITIONAL = 0
+IMMEDIATE  = 1
+RELATIVE   = 2
+
+MAX_MODES = 3  # an instruction takes at most 3 parameters
+
+Instruction = namedtuple("Instruction", ["opcode", "modes", "arity"])
+Instruction.__doc__ = """
+Decoded instruction word.
+  opcode -- the opcode (1..9 or 99)
+  modes  -- tuple of MAX_MODES parameter modes, unspecified modes are 0
+  arity  -- number of parameters the instruction takes
+"""
+
+def _build_decode_table():
+    largest = int(str(RELATIVE) * MAX_MODES + "99")
+    table = [None] * (1 + largest)
+    for modes in product(range(1 + RELATIVE), repeat=MAX_MODES):
+        for opcode, arity in ARITY.items():
+            word = opcode + sum(m * 10**(offset+2) for offset, m in enumerate(modes))
+            table[word] = Instruction(opcode, modes, arity)
+    return table
+
+DECODE_TABLE = _build_decode_table()
+
+def decode(word):
+    """
+    Return the Instruction that corresponds to given instruction <word> or
+    raise ValueError if <word> is not a legal instruction word.
+
+    >>> decode(1002)
+    Instruction(opcode=2, modes=(0, 1, 0), arity=3)
+    >>> decode(99)
+    Instruction(opcode=99, modes=(0, 0, 0), arity=0)
+    >>> decode(22209)
+    Instruction(opcode=9, modes=(2, 2, 2), arity=1)
+    >>> decode(109) is DECODE_TABLE[109]
+    True
+    >>> decode(22299)
+    Instruction(opcode=99, modes=(2, 2, 2), arity=0)
+    >>> decode(1003).modes
+    (0, 1, 0)
+    >>> decode(37)
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown opcode 37
+    >>> decode(301)
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown opcode 301
+    >>> decode(-1)
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown opcode -1
+    """
+    instr = DECODE_TABLE[word] if 0 <= word < len(DECODE_TABLE) else None
+    if instr is None:
+        raise ValueError(f"Unknown opcode {word}")
+    return instr
+
+def format_param(param, mode):
+    """
+    Human-readable parameter: [address], [rb+offset] or immediate value.
+
+    >>> format_param(12, POSITIONAL), format_param(12, IMMEDIATE)
+    ('[12]', '12')
+    >>> format_param(3, RELATIVE), format_param(-3, RELATIVE)
+    ('[rb+3]', '[rb-3]')
+    """
+    if mode == IMMEDIATE:
+        return str(param)
+    if mode == RELATIVE:
+        return f"[rb{param:+}]"
+    return f"[{param}]"
+
+def format_instruction(words):
+    """
+    Human-readable representation of the instruction encoded in <words>:
+    the instruction word followed by the parameters.
+
+    >>> format_instruction([1002, 4, 3, 4])
+    'MULTIPLY [4], 3, [4]'
+    >>> format_instruction([21101, 2, 3, -1])
+    'SUM 2, 3, [rb-1]'
+    >>> format_instruction([99])
+    'HALT'
+    """
+    instr = decode(words[0])
+    params = [format_param(p, m) for p, m in zip(words[1:1+instr.arity], instr.modes)]
+    return " ".join([MNEMONICS[instr.opcode], ", ".join(params)]).strip()
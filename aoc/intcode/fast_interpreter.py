@@ -0,0 +1,334 @@
+
+import sys
+from .tape import Tape, SPARSE_GAP
+from .channel import Channel
+from .interpreter import Interpreter
+from .decoder import DECODE_TABLE
+
+# instruction word -> (opcode, mode of 1st, 2nd and 3rd parameter)
+# Illegal instruction words are not in the dictionary.
+OPS = { word: (instr.opcode,) + instr.modes
+        for word, instr in enumerate(DECODE_TABLE) if instr is not None }
+
+class FastInterpreter(Interpreter):
+    """
+    Drop-in replacement for Interpreter that runs the program in a single loop
+    over the memory of the tape (a plain list), keeping the program counter,
+    the relative base and the memory in local variables. Handlers are not
+    separate methods but branches of the loop.
+
+    Public interface (inputs, outputs, set_uplink_to, finished, status and
+    suspending after output when there is an uplink) is the same as that of
+    Interpreter. When a tracer is attached (also verbose=True), execution is
+    delegated to Interpreter.
+
+    >>> ii = FastInterpreter("1,5,6,0,99,10,20")
+    >>> ii.execute()
+    30
+    >>> str(ii.tape)
+    '30,5,6,0,99,10,20'
+
+    >>> ii = FastInterpreter("1,9,10,3,2,3,11,0,99,30,40,50")
+    >>> ii.execute()
+    3500
+
+    >>> ii = FastInterpreter("3,0,4,0,99", inputs=[20])
+    >>> ii.execute()
+    20
+    20
+
+    >>> ii = FastInterpreter("1002,4,3,4,33")
+    >>> ii.execute()
+    1002
+
+    >>> s = "3,21,1008,21,8,20,1005,20,22,107,8,21,20,1006,20,31,1106,0,36,98,0,0,1002,21,125,20,4,20,1105,1,46,104,999,1105,1,46,1101,1000,1,20,4,20,1105,1,46,98,99"
+    >>> for i in [7, 8, 9]:
+    ...     _ = FastInterpreter(s, inputs=[i]).execute()
+    999
+    1000
+    1001
+
+    >>> s = "3,12,6,12,15,1,13,14,13,4,13,99,-1,0,1,9"
+    >>> _ = FastInterpreter(s, inputs=[0]).execute()
+    0
+
+    >>> s = "109,1,204,-1,1001,100,1,100,1008,100,16,101,1006,101,0,99"
+    >>> outputs = []
+    >>> _ = FastInterpreter(s, outputs=outputs).execute()
+    >>> ",".join(map(str, outputs)) == s
+    True
+
+    >>> _ = FastInterpreter("104,1125899906842624,99").execute()
+    1125899906842624
+
+    # suspends after each output when connected to a host
+    >>> class Host(object):
+    ...     inputs = []
+    >>> ii = FastInterpreter("104,1,104,2,99")
+    >>> ii.set_uplink_to(Host())
+    >>> _ = ii.execute(); ii.outputs, ii.finished
+    ([1], False)
+    >>> _ = ii.execute(); _ = ii.execute(); ii.outputs, ii.finished
+    ([1, 2], True)
+
+    # suspends before output to a full channel until it gets drained
+    >>> ii = FastInterpreter("104,1,104,2,104,3,99", outputs=Channel(capacity=2))
+    >>> _ = ii.execute(); ii.outputs, ii.finished
+    (Channel([1, 2], capacity=2), False)
+    >>> ii.outputs.drain()
+    [1, 2]
+    >>> _ = ii.execute(); ii.outputs, ii.finished
+    (Channel([3], capacity=2), True)
+
+    # writing far beyond the end of the program does not allocate memory up to there
+    >>> ii = FastInterpreter("21101,7,8,100000000,4,100000000,99")
+    >>> _ = ii.execute()
+    15
+    >>> len(ii.tape), len(ii.tape.cells)
+    (100000001, 7)
+
+    # and neither does executing code that is stored there
+    >>> s = "1101,104,0,100000000,1101,7,0,100000001,1101,99,0,100000002,1105,1,100000000"
+    >>> ii = FastInterpreter(s)
+    >>> _ = ii.execute()
+    7
+    >>> len(ii.tape.cells)
+    15
+
+    >>> FastInterpreter("1105,1,100000000").execute()
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown opcode 0
+
+    >>> FastInterpreter("1105,1,-2").execute()
+    Traceback (most recent call last):
+    ...
+    ValueError: Attempting to read tape at negative address: -2
+
+    # memory stored in an array switches to a list to hold large values
+    >>> tape = Tape("1102,4294967296,4294967296,0,4,0,99", storage="array")
+    >>> _ = FastInterpreter(tape).execute()
+    18446744073709551616
+    >>> tape.storage
+    'list'
+
+    >>> FastInterpreter("1,0,0,0,37").execute()
+    Traceback (most recent call last):
+    ...
+    ValueError: Unknown opcode 37
+    """
+
+    def execute(self):
+        if self.tracer is not None:
+            return super().execute()
+
+        if self.running == -1:
+            return self.result
+
+        self._run(1 if self.uplink is not None else None, None, False)
+
+        return self.tape.at(0)
+
+    def run_until(self, outputs=None, steps=None):
+        """
+        See Interpreter.run_until()
+
+        >>> s = "3,20,104,1,104,2,104,3,1001,20,-1,20,1005,20,2,99"
+        >>> ii = FastInterpreter(s, inputs=[], outputs=[])
+        >>> ii.run_until(outputs=2)
+        'INPUT_NEEDED'
+        >>> ii.inputs.append(2)
+        >>> ii.run_until(outputs=2), ii.outputs
+        ('OUTPUTS', [1, 2])
+        >>> ii.run_until(steps=3), ii.outputs
+        ('STEPS', [1, 2, 3])
+        >>> ii.run_until(), ii.outputs
+        ('HALTED', [1, 2, 3, 1, 2, 3])
+        >>> ii.num_steps
+        12
+        >>> ii.run_until(outputs=0)
+        Traceback (most recent call last):
+        ...
+        ValueError: Number of outputs must be positive: 0
+        """
+        if outputs is not None and outputs < 1:
+            raise ValueError(f"Number of outputs must be positive: {outputs}")
+
+        if self.tracer is not None:
+            return super().run_until(outputs, steps)
+
+        if self.running == -1:
+            return self.HALTED
+
+        return self._run(outputs, steps, True)
+
+    def _run(self, max_outputs, max_steps, wait_for_input):
+        """
+        Run the program until it has output <max_outputs> values (if not None)
+        or executed <max_steps> instructions (if not None). If <wait_for_input>
+        is True, stop before reading input if there is none, otherwise ask
+        for it on stdin. Returns the reason for stopping (see run_until()).
+        """
+        if self.running == 0:
+            self.running = 1
+            self.status = "STARTING"
+            self.tape.rewind()
+        else:
+            self.status = "RESUMING"
+
+        tape    = self.tape
+        mem     = tape.cells
+        pc      = tape.position
+        rb      = self.relative_base
+        inputs  = self.inputs
+        fifo    = hasattr(inputs, "popleft")
+        outputs = self.outputs if hasattr(self.outputs, "append") else None
+        limit   = getattr(outputs, "capacity", None)
+        ops     = OPS
+        start   = -1 if max_steps is None else max_steps
+        budget  = start # instructions left (counts down from -1 if unlimited)
+        count   = max_outputs or 0 # outputs left (if max_outputs)
+        reason  = self.HALTED
+
+        while True:
+            if budget == 0:
+                reason = self.STEPS
+                break
+            budget -= 1
+
+            try:
+                op, m1, m2, m3 = ops[mem[pc]]
+
+                if op == 99:
+                    self.running = -1
+                    break
+
+                # the 1st parameter as value (x) or as address (a)
+                a = x = mem[pc+1]
+                if m1 != 1:
+                    if m1: a = x = x + rb
+                    if op != 3:
+                        x = mem[x] if 0 <= x < len(mem) else tape.at(x)
+
+                if op == 3:
+                    if inputs:
+                        val = inputs.popleft() if fifo else inputs.pop(0)
+                    elif wait_for_input:
+                        reason = self.INPUT_NEEDED
+                        budget += 1
+                        break
+                    else:
+                        print("Please input an integer:")
+                        val = int(sys.stdin.readline().strip())
+                    if 0 <= a < len(mem): mem[a] = val
+                    else:
+                        tape.write_to(a, val)
+                        mem = tape.cells
+                    pc += 2
+                    continue
+
+                if op == 4:
+                    if limit is not None and len(outputs) >= limit:
+                        self.status = reason = self.BLOCKED
+                        budget += 1
+                        break
+                    pc += 2
+                    self.result = x
+                    if outputs is not None:
+                        outputs.append(x)
+                    else:
+                        print(x)
+                    if max_outputs:
+                        count -= 1
+                        if count == 0:
+                            reason = self.OUTPUTS
+                            break
+                    continue
+
+                if op == 9:
+                    rb += x
+                    pc += 2
+                    continue
+
+                # the 2nd parameter
+                y = mem[pc+2]
+                if m2 != 1:
+                    if m2: y += rb
+                    y = mem[y] if 0 <= y < len(mem) else tape.at(y)
+
+                if op == 5:
+                    pc = y if x != 0 else pc + 3
+                    if pc < 0: tape.at(pc) # raises
+                    continue
+
+                if op == 6:
+                    pc = y if x == 0 else pc + 3
+                    if pc < 0: tape.at(pc) # raises
+                    continue
+
+                if   op == 1: val = x + y
+                elif op == 2: val = x * y
+                elif op == 7: val = 1 if x < y else 0
+                else:         val = 1 if x == y else 0
+
+                # the 3rd parameter is always an address
+                a = mem[pc+3]
+                if m3: a += rb
+                if 0 <= a < len(mem): mem[a] = val
+                else:
+                    tape.write_to(a, val)
+                    mem = tape.cells
+                pc += 4
+
+            except KeyError:
+                raise ValueError(f"Unknown opcode {mem[pc]}") from None
+
+            except IndexError:
+                # the instruction does not fit into dense memory, fetch it
+                # through the tape that also reads sparse pages
+                word = tape.at(pc)
+                if word not in ops:
+                    raise ValueError(f"Unknown opcode {word}") from None
+
+                if pc + 3 < len(mem) + SPARSE_GAP:
+                    # close to the end: grow dense memory as writing there would
+                    tape.reserve(pc+3)
+                    mem = tape.cells
+                    budget += 1
+                    continue
+
+                # far beyond the end: execute the instruction through the tape
+                op = ops[word][0]
+                if op == 3 and not inputs and wait_for_input:
+                    reason = self.INPUT_NEEDED
+                    budget += 1
+                    break
+                if op == 4 and limit is not None and len(outputs) >= limit:
+                    self.status = reason = self.BLOCKED
+                    budget += 1
+                    break
+                tape.position, self.relative_base = pc, rb
+                Interpreter.step(self)
+                pc, rb, mem = tape.position, self.relative_base, tape.cells
+                if op == 99:
+                    break
+                if op == 4:
+                    self.running = 1 # do_output() suspends when uplinked
+                    if max_outputs:
+                        count -= 1
+                        if count == 0:
+                            reason = self.OUTPUTS
+                            break
+
+            except OverflowError:
+                # the value does not fit into array storage of the tape,
+                # writing through the tape switches it to a list
+                tape.write_to(a, val)
+                mem = tape.cells
+                pc += 2 if op == 3 else 4
+
+        tape.position = pc
+        self.relative_base = rb
+        self.num_steps += start - budget
+
+        return reason
@@ -0,0 +1,111 @@
+"""
+Binary images of Intcode programs.
+
+Parsing the text of a program (splitting on commas and converting every token
+to int) is the slowest part of loading it. An image is the program already
+parsed: a header followed by the cells as 64-bit integers in the byte order of
+the machine. The header holds the hash of the program text the image was made
+from, so an image made from other text is ignored.
+
+Tape.read_from_file(use_image=True) looks for the image next to the text file
+(the name of the text file + IMAGE_SUFFIX), uses it when it is fresh and
+writes it after parsing the text otherwise. An image is written into a
+temporary file that then replaces the image at once, so that processes that
+load the same program at the same time never see a partial image. Images
+larger than MMAP_THRESHOLD bytes are read through a memory map.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+MAGIC          = b"INTCODE1"
+HEADER         = struct.Struct("<8s1s32sQ") # magic, byte order, hash of text, number of cells
+IMAGE_SUFFIX   = ".img"
+MMAP_THRESHOLD = 1 << 20
+
+def image_path(fname):
+    return fname + IMAGE_SUFFIX
+
+def text_hash(text):
+    return hashlib.blake2b(text.encode(), digest_size=32).digest()
+
+def _byteorder():
+    return b"<" if sys.byteorder == "little" else b">"
+
+def write_image(fname, text, cells):
+    """
+    Write <cells> parsed from program <text> as an image to file <fname>.
+    Return False if some value does not fit into 64 bits and there is no image.
+    """
+    try:
+        data = cells if isinstance(cells, array) else array("q", cells)
+    except OverflowError:
+        return False
+    header = HEADER.pack(MAGIC, _byteorder(), text_hash(text), len(data))
+    fd, tmpname = tempfile.mkstemp(prefix=os.path.basename(fname) + ".",
+                                   dir=os.path.dirname(fname) or ".")
+    try:
+        with os.fdopen(fd, "wb") as fd:
+            fd.write(header)
+            data.tofile(fd)
+        os.replace(tmpname, fname)
+    except BaseException:
+        os.unlink(tmpname)
+        raise
+    return True
+
+def read_image(fname, text, storage="list"):
+    """
+    Read cells from image file <fname> made from program <text>. Return an
+    array (storage="array") or a list of cells, or None if there is no such
+    file or it was made from other text.
+
+    >>> tmpdir = tempfile.TemporaryDirectory()
+    >>> fname = os.path.join(tmpdir.name, "prg.img")
+    >>> write_image(fname, "1,0,0,3,99", [1, 0, 0, 3, 99])
+    True
+    >>> read_image(fname, "1,0,0,3,99")
+    [1, 0, 0, 3, 99]
+    >>> read_image(fname, "1,0,0,3,99", storage="array")
+    array('q', [1, 0, 0, 3, 99])
+    >>> read_image(fname, "1,0,0,4,99") is None
+    True
+    >>> write_image(fname, "104,2**70,99", [104, 2**70, 99])
+    False
+    >>> os.listdir(tmpdir.name)
+    ['prg.img']
+    >>> tmpdir.cleanup()
+    """
+    try:
+        fd = open(fname, "rb")
+    except OSError:
+        return None
+
+    with fd:
+        header = fd.read(HEADER.size)
+        if len(header) != HEADER.size:
+            return None
+        magic, order, digest, count = HEADER.unpack(header)
+        if magic != MAGIC or order != _byteorder() or digest != text_hash(text):
+            return None
+
+        nbytes = count * array("q").itemsize
+        cells = array("q")
+        if nbytes >= MMAP_THRESHOLD:
+            with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if len(mm) != HEADER.size + nbytes:
+                    return None
+                with memoryview(mm)[HEADER.size:] as view:
+                    cells.frombytes(view)
+        else:
+            data = fd.read(nbytes)
+            if len(data) != nbytes:
+                return None
+            cells.frombytes(data)
+
+    return cells if storage == "array" else cells.tolist()
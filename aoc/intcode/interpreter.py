@@ -4,23 +4,43 @@
 # 2. can yield be used in do_output to imitate switching?
 
 import sys
+from collections import namedtuple
+
 from .tape import Tape
+from .channel import Channel
+from .decoder import ARITY, DECODE_TABLE, WRITES, RELATIVE, IMMEDIATE, decode
+from .tracing import Tracer, TraceRecord, StreamSink
+from .profiler import Profiler
+
+Snapshot = namedtuple("Snapshot", ["tape", "relative_base", "running", "status",
+                                   "result", "inputs", "outputs"])
 
 class Interpreter(object):
-    opcodes = [1,2,3,4,5,6,7,8,99]
+    opcodes = sorted(ARITY)
+
+    # reasons for run_until() to stop
+    HALTED       = "HALTED"       # the program has come to a halt
+    INPUT_NEEDED = "INPUT_NEEDED" # the program is about to read input, there is none
+    OUTPUTS      = "OUTPUTS"      # the program has output the number of values asked for
+    STEPS        = "STEPS"        # the budget of instructions has been used up
+    BLOCKED      = "BLOCKED"      # the channel of outputs is full
 
     def __init__(self, tape, inputs=None, outputs=None):
         self.tape = Tape(tape) if isinstance(tape, str) else tape
+        self.tracer = None
         self.verbose = False
         self.result = None
         self.inputs = inputs
         self.outputs = outputs
-        self.param_modes = []
+        self.instruction = None
+        self.param_modes = ()
+        self.param_index = 0
         self.relative_base = 0
         self.running = 0  # (-1,0,1) (halt,idle,running)
         self.device_id = None
         self.status = "IDLE"
         self.uplink = None
+        self.num_steps = 0 # instructions executed by run_until()
 
     def execute(self):
         """
@@ -108,7 +128,8 @@ class Interpreter(object):
             self.running = 1
             self.status = "STARTING"
             self.tape.rewind()
-            self._vprint(f"TAPE: {self.tape}")
+            if self.verbose:
+                self._vprint(f"TAPE: {self.tape}")
 
         elif self.running >= 1:
             self.status = "RESUMING"
@@ -116,23 +137,13 @@ class Interpreter(object):
         elif self.running == -1:
             return self.result
 
-        self._vprint(f"{self._about()} is {self.status} inputs={self.inputs}")
+        if self.verbose:
+            self._vprint(f"{self._about()} is {self.status} inputs={self.inputs}")
+
+        step = self.step if self.tracer is None else self._traced_step
 
         while self.running == 1:
-            code = self.read_opcode()
-
-            if   code == 99: self.do_halt()
-            elif code ==  1: self.do_sum()
-            elif code ==  2: self.do_multiply()
-            elif code ==  3: self.do_read_input()
-            elif code ==  4: self.do_output()
-            elif code ==  5: self.do_jump_if_true()
-            elif code ==  6: self.do_jump_if_false()
-            elif code ==  7: self.do_iflt()
-            elif code ==  8: self.do_ifeq()
-            elif code ==  9: self.do_adjust_relative_base()
-            else:
-                raise ValueError(f"Unknown opcode {code}")
+            step()
 
             if self.running == 2:
                 # (day 11) wait for input, alternative to mutual recursion
@@ -141,18 +152,369 @@ class Interpreter(object):
 
         return self.tape.at(0) # not always :(
 
+    def run(self):
+        """
+        Run the program as a generator that yields every value output by the
+        program. When the program needs input and there is none, the generator
+        yields None and expects the input value to be sent back with send().
+        Values sent at other times are added to the inputs.
+        Outputs are not stored in <outputs> and the uplink is not used.
+
+        >>> s = "3,20,1002,20,2,21,4,21,4,20,1005,20,0,99"
+        >>> program = Interpreter(s).run()
+        >>> next(program) is None # needs input
+        True
+        >>> program.send(5), next(program)
+        (10, 5)
+        >>> next(program) is None # needs input again
+        True
+        >>> program.send(0), next(program)
+        (0, 0)
+        >>> next(program, "halted")
+        'halted'
+
+        A host that talks to a program can be a plain loop
+
+        >>> program = Interpreter(s, inputs=[3, 2, 0]).run()
+        >>> [value for value in program]
+        [6, 3, 4, 2, 0, 0]
+        """
+        if self.inputs is None:
+            self.inputs = []
+
+        outputs, self.outputs = self.outputs, []
+        try:
+            while True:
+                reason = self.run_until(outputs=1)
+                if reason == self.OUTPUTS:
+                    value = self.outputs.pop()
+                elif reason == self.INPUT_NEEDED:
+                    value = None
+                else:
+                    return
+
+                sent = yield value
+                if sent is not None:
+                    self.inputs.append(sent)
+        finally:
+            self.outputs = outputs
+
+    def run_until(self, outputs=None, steps=None):
+        """
+        Run the program until it has output <outputs> values (a positive
+        number) or executed <steps> instructions. It also stops when it halts,
+        when it is about to read input and there is none (instead of asking
+        for it on stdin) and before writing to a full channel. Unlike
+        execute(), it does not suspend after each output when there is an
+        uplink.
+        Returns the reason for stopping: HALTED, INPUT_NEEDED, OUTPUTS, STEPS
+        or BLOCKED. Executed instructions are counted in <num_steps>.
+
+        >>> s = "3,20,104,1,104,2,104,3,1001,20,-1,20,1005,20,2,99"
+        >>> ii = Interpreter(s, inputs=[], outputs=[])
+        >>> ii.run_until(outputs=2)
+        'INPUT_NEEDED'
+        >>> ii.inputs.append(2)
+        >>> ii.run_until(outputs=2), ii.outputs
+        ('OUTPUTS', [1, 2])
+        >>> ii.run_until(steps=3), ii.outputs
+        ('STEPS', [1, 2, 3])
+        >>> ii.run_until(), ii.outputs
+        ('HALTED', [1, 2, 3, 1, 2, 3])
+        >>> ii.run_until()
+        'HALTED'
+        >>> ii.num_steps
+        12
+        >>> ii.run_until(outputs=0)
+        Traceback (most recent call last):
+        ...
+        ValueError: Number of outputs must be positive: 0
+        """
+        if outputs is not None and outputs < 1:
+            raise ValueError(f"Number of outputs must be positive: {outputs}")
+
+        if self.running == -1:
+            return self.HALTED
+
+        if self.running == 0:
+            self.running = 1
+            self.status = "STARTING"
+            self.tape.rewind()
+        else:
+            self.running = 1
+            self.status = "RESUMING"
+
+        step = self.step if self.tracer is None else self._traced_step
+        tape = self.tape
+        num_outputs = 0
+        start = self.num_steps
+
+        while True:
+            if steps is not None and self.num_steps - start >= steps:
+                return self.STEPS
+
+            op = tape.at() % 100
+            if op == 3 and not self.inputs:
+                return self.INPUT_NEEDED
+            if op == 4 and getattr(self.outputs, "full", False):
+                return self.BLOCKED
+
+            step()
+            self.num_steps += 1
+
+            if self.running == -1:
+                return self.HALTED
+
+            if op == 4:
+                self.running = 1
+                num_outputs += 1
+                if outputs is not None and num_outputs >= outputs:
+                    return self.OUTPUTS
+
+    def step(self):
+        """
+        Execute one instruction at the current position of the tape.
+
+        >>> ii = Interpreter("1101,2,3,0,99")
+        >>> ii.step()
+        >>> ii.tape.at(0), ii.tape.position
+        (5, 4)
+        """
+        code = self.read_opcode()
+
+        if   code == 99: self.do_halt()
+        elif code ==  1: self.do_sum()
+        elif code ==  2: self.do_multiply()
+        elif code ==  3: self.do_read_input()
+        elif code ==  4: self.do_output()
+        elif code ==  5: self.do_jump_if_true()
+        elif code ==  6: self.do_jump_if_false()
+        elif code ==  7: self.do_iflt()
+        elif code ==  8: self.do_ifeq()
+        elif code ==  9: self.do_adjust_relative_base()
+
+    def _traced_step(self):
+        """
+        Execute one instruction and report it to the tracer.
+
+        >>> records = []
+        >>> ii = Interpreter("3,9,1001,9,5,9,4,9,99,0", inputs=[2], outputs=[])
+        >>> ii.tracer = Tracer(records.append)
+        >>> _ = ii.execute()
+        >>> for r in records: print(r)
+        TraceRecord(address=0, opcode=3, operands=(9,), result=2)
+        TraceRecord(address=2, opcode=1, operands=(2, 5, 9), result=7)
+        TraceRecord(address=6, opcode=4, operands=(7,), result=7)
+        TraceRecord(address=8, opcode=99, operands=(), result=None)
+
+        >>> from .tracing import JUMP
+        >>> records = []
+        >>> ii = Interpreter("1105,1,4,0,104,3,99", outputs=[])
+        >>> ii.tracer = Tracer(records.append, JUMP)
+        >>> _ = ii.execute()
+        >>> records
+        [TraceRecord(address=0, opcode=5, operands=(1, 4), result=4)]
+
+        A jump to itself is executed and traced
+
+        >>> records = []
+        >>> ii = Interpreter("1105,1,0", outputs=[])
+        >>> ii.tracer = Tracer(records.append, JUMP)
+        >>> ii._traced_step(); ii._traced_step()
+        >>> len(records)
+        2
+        """
+        tape = self.tape
+        addr = tape.position
+        instr = decode(tape.at(addr))
+
+        if not self.tracer.wants(instr.opcode):
+            return self.step()
+
+        operands = self.peek_params(instr, addr)
+        blocked = instr.opcode == 4 and getattr(self.outputs, "full", False)
+
+        self.step()
+
+        if blocked:
+            # suspended before the output, the instruction was not executed
+            return
+
+        op = instr.opcode
+        if op in WRITES:
+            result = tape.at(operands[WRITES[op]])
+        elif op == 4:
+            result = self.result
+        elif op in (5, 6):
+            result = tape.position
+        elif op == 9:
+            result = self.relative_base
+        else:
+            result = None
+
+        self.tracer.emit(TraceRecord(addr, op, operands, result))
+
+    def peek_params(self, instr, addr):
+        """
+        Return values of the parameters of given instruction <instr> located at
+        address <addr>, without executing it. Parameters that are addresses to
+        write to are returned as addresses.
+
+        >>> ii = Interpreter("1002,4,3,4,33")
+        >>> ii.peek_params(decode(1002), 0)
+        (33, 3, 4)
+        """
+        params = []
+        for i in range(instr.arity):
+            val = self.tape.at(addr+1+i)
+            pmode = instr.modes[i]
+            if pmode == RELATIVE:
+                val += self.relative_base
+            if pmode != IMMEDIATE and WRITES.get(instr.opcode) != i:
+                val = self.tape.at(val)
+            params.append(val)
+        return tuple(params)
+
+    def profile(self):
+        """
+        Start profiling execution: attach to the computer and return a Profiler
+        that will collect execution statistics.
+
+        >>> ii = Interpreter("1101,1,1,0,99")
+        >>> profiler = ii.profile()
+        >>> ii.execute()
+        2
+        >>> profiler.total
+        2
+        """
+        return Profiler().attach(self)
+
+    @property
+    def verbose(self):
+        return self._verbose
+
+    @verbose.setter
+    def verbose(self, verbose):
+        """
+        Being verbose means tracing every instruction to stderr.
+        """
+        self._verbose = verbose
+        if verbose and self.tracer is None:
+            self.tracer = Tracer(StreamSink())
+        elif not verbose and isinstance(getattr(self.tracer, "sink", None), StreamSink):
+            self.tracer = None
+
+    def snapshot(self):
+        """
+        Save the state of the computer: memory, position on the tape, relative
+        base and contents of I/O buffers. Memory is shared with the computer
+        and copied page by page only when written to.
+
+        # the program counts 0,1,2,... outputting each number
+        >>> class Host(object):
+        ...     inputs = []
+        >>> host = Host()
+        >>> ii = Interpreter("4,9,1001,9,1,9,1105,1,0,0")
+        >>> ii.set_uplink_to(host) # stop after each output
+        >>> _ = ii.execute(); _ = ii.execute(); ii.outputs
+        [0, 1]
+        >>> snap = ii.snapshot()
+        >>> _ = ii.execute(); _ = ii.execute(); ii.outputs
+        [0, 1, 2, 3]
+        >>> ii.restore(snap)
+        >>> ii.outputs, str(ii.tape)
+        ([0, 1], '4,9,1001,9,1,9,1105,1,0,1')
+        >>> _ = ii.execute(); ii.outputs
+        [0, 1, 2]
+        >>> ii.outputs is host.inputs
+        True
+        """
+        return Snapshot(self.tape.fork(), self.relative_base, self.running,
+                        self.status, self.result,
+                        self._copy_buffer(self.inputs), self._copy_buffer(self.outputs))
+
+    def restore(self, snapshot):
+        """
+        Bring the computer back to the state saved in <snapshot>. I/O buffers
+        are updated in place, therefore they remain connected to other devices.
+        """
+        self.tape.copy_from(snapshot.tape)
+        self.relative_base = snapshot.relative_base
+        self.running = snapshot.running
+        self.status = snapshot.status
+        self.result = snapshot.result
+        self.inputs = self._restore_buffer(self.inputs, snapshot.inputs)
+        self.outputs = self._restore_buffer(self.outputs, snapshot.outputs)
+
+    def fork(self):
+        """
+        Return a new computer of the same class in the same state as this one:
+        memory (shared page by page until written to), position on the tape,
+        relative base and copies of I/O buffers. The new computer is not
+        connected to the uplink of this one.
+
+        >>> ii = Interpreter("3,9,1001,9,1,9,4,9,99,0", outputs=[])
+        >>> ii.inputs = [10]
+        >>> kk = ii.fork()
+        >>> kk.inputs = [20]
+        >>> _ = ii.execute(); _ = kk.execute()
+        >>> ii.outputs, kk.outputs
+        ([11], [21])
+        """
+        other = self.__class__(self.tape.fork(),
+                               self._copy_buffer(self.inputs),
+                               self._copy_buffer(self.outputs))
+        other.relative_base = self.relative_base
+        other.running = self.running
+        other.status = self.status
+        other.result = self.result
+        other.device_id = self.device_id
+        return other
+
+    def _copy_buffer(self, buffer):
+        if isinstance(buffer, type([])):
+            return list(buffer)
+        if isinstance(buffer, Channel):
+            return buffer.copy()
+        return buffer
+
+    def _restore_buffer(self, buffer, saved):
+        if isinstance(buffer, type([])) and isinstance(saved, type([])):
+            buffer[:] = saved
+            return buffer
+        if isinstance(buffer, Channel) and isinstance(saved, Channel):
+            buffer.clear()
+            buffer.extend(saved)
+            return buffer
+        return self._copy_buffer(saved)
+
     def _about(self):
         return f"DEVICE {self.__class__.__name__} with id={self.device_id}"
 
     def set_uplink_to(self, other):
-        self.uplink  = other
-        self.outputs = self.uplink.inputs
+        """
+        Connect the outputs of this computer to the inputs of device <other>,
+        a list or a Channel. The computer suspends after each output.
+
+        >>> class Host(object):
+        ...     def __init__(self):
+        ...         self.inputs = []
+        >>> host = Host()
+        >>> received = host.inputs
+        >>> ii = Interpreter("104,1,104,2,99")
+        >>> ii.set_uplink_to(host)
+        >>> _ = ii.execute(); _ = ii.execute()
+        >>> host.inputs.pop(0), received
+        (1, [2])
+        """
+        self.uplink = other
+        self.outputs = other.inputs
 
     def do_halt(self):
         if self.running == -1:
             return False
-        self._vprint(f"ADDR={self.tape.position} HALT, result={self.result}")
-        self._vprint(f"{self._about()} has become HALT")
+        if self.verbose:
+            self._vprint(f"{self._about()} has become HALT")
         self.running = -1
         # not sure if it is necessary to halt connected controllers
         # if self.uplink:
@@ -166,40 +528,60 @@ class Interpreter(object):
         return self.running == -1
 
     def read_opcode(self):
-        del self.param_modes[:]
+        """
+        Read the instruction word at the current position and decode it using
+        the precomputed decode table. Parameter modes of the instruction become
+        available in <param_modes>.
+
+        >>> ii = Interpreter("1002,4,3,4,33")
+        >>> ii.read_opcode()
+        2
+        >>> ii.param_modes
+        (0, 1, 0)
+        >>> ii.instruction.arity
+        3
+        >>> Interpreter("1037").read_opcode()
+        Traceback (most recent call last):
+        ...
+        ValueError: Unknown opcode 1037
+        """
         code = self.tape.read()
 
-        # handle a complex opcode that contain both the instruction and parameter
-        # modes.
-        if code not in self.__class__.opcodes:
-            for offset in range(2, len(str(code))):
-                pmode = int(code % 10**(offset+1) / 10**offset)
-                self.param_modes.append(pmode)
-            code = code % 100
+        instr = DECODE_TABLE[code] if 0 <= code < len(DECODE_TABLE) else None
+        if instr is None:
+            raise ValueError(f"Unknown opcode {code}")
 
-        return code
+        self.instruction = instr
+        self.param_modes = instr.modes
+        self.param_index = 0
+
+        return instr.opcode
 
     def do_read_input(self):
-        addr = self.tape.position
-        self._vprint(f"ADDR={addr}, READ-INPUT, param modes: {self.param_modes}")
         arg_1 = self.read_param(immediate=True)
         if self.inputs:
-            arg_2 = self.inputs.pop(0)
+            if hasattr(self.inputs, "popleft"):
+                arg_2 = self.inputs.popleft()
+            else:
+                arg_2 = self.inputs.pop(0)
         else:
             print("Please input an integer:")
             arg_2 = int(sys.stdin.readline().strip())
-        self._vprint(f"ADDR={addr}, READ-INPUT, value {arg_2}, saving it at {arg_1}")
         self.tape.write_to(arg_1, arg_2)
-        self._vprint(f"Tape: {self.tape}")
 
     def do_output(self):
-        addr = self.tape.position
+        if getattr(self.outputs, "full", False):
+            # the reader has not drained the channel yet, suspend and
+            # execute this instruction again when resumed
+            self.tape.rewind(-1)
+            self.status = "BLOCKED"
+            self.running = 2
+            return
+
         arg_1 = self.read_param()
-        self._vprint(f"ADDR={addr}, OUTPUT, params {(arg_1)}")
-        self._vprint(f"Tape: {self.tape}")
         self.result = arg_1
 
-        if isinstance(self.outputs, type([])):
+        if hasattr(self.outputs, "append"):
             self.outputs.append(arg_1)
         else:
             print(arg_1)
@@ -212,87 +594,59 @@ class Interpreter(object):
             # TODO: test if it works for day 7, 9
             self.running = 2
 
-            # TODO: can it be reused in previous days: 7,9,11,15 etc
-            #yield self.outputs
+            # hosts that do not want to be an uplink can iterate over run()
 
     def do_adjust_relative_base(self):
-        addr = self.tape.position
         arg_1 = self.read_param()
         self.relative_base += arg_1
-        self._vprint(f"ADDR={addr}, ADJUST-REL-BASE, params {(arg_1)} sets relative base to {self.relative_base}")
-        self._vprint(f"Tape: {self.tape}")
 
     def do_sum(self):
-        addr = self.tape.position
-        self._vprint(f"ADDR={addr}, SUM, PARAM modes: {self.param_modes}")
         arg_1 = self.read_param()
         arg_2 = self.read_param()
         arg_3 = self.read_param(immediate=True)
         val   = arg_1 + arg_2
-        self._vprint(f"ADDR={addr}, SUM, params: {(arg_1, arg_2)} saving {val} at {arg_3}")
         self.tape.write_to(arg_3, val)
-        self._vprint(f"Tape: {self.tape}")
 
     def do_multiply(self):
-        addr = self.tape.position
-        self._vprint(f"ADDR={addr}, MULTIPLY, PARAM modes: {self.param_modes}")
         arg_1 = self.read_param()
         arg_2 = self.read_param()
         arg_3 = self.read_param(immediate=True)
         val   = arg_1 * arg_2
-        self._vprint(f"ADDR={addr}, MULTIPLY, params: {(arg_1, arg_2)} saving {val} at {arg_3}")
         self.tape.write_to(arg_3, val)
-        self._vprint(f"Tape: {self.tape}")
 
     def do_iflt(self):
-        addr = self.tape.position
         arg_1 = self.read_param()
         arg_2 = self.read_param()
         arg_3 = self.read_param(immediate=True)
         val = 1 if arg_1 < arg_2 else 0
-        self._vprint(f"ADDR={addr}, IFLT, params: {(arg_1, arg_2)} saving {val} at {arg_3}")
         self.tape.write_to(arg_3, val)
-        self._vprint(f"Tape: {self.tape}")
 
     def do_ifeq(self):
-        addr = self.tape.position
         arg_1 = self.read_param()
         arg_2 = self.read_param()
         arg_3 = self.read_param(immediate=True)
         val = 1 if arg_1 == arg_2 else 0
-        self._vprint(f"ADDR={addr}, IFEQ, params: {(arg_1, arg_2)} saving {val} at {arg_3}")
         self.tape.write_to(arg_3, val)
-        self._vprint(f"Tape: {self.tape}")
 
     def do_jump_if_true(self):
         """
         If the first parameter is non-zero, it sets the instruction
         pointer to the value from the second parameter. Otherwise, it does nothing.
         """
-        addr = self.tape.position
         arg_1 = self.read_param()
         arg_2 = self.read_param()
-        action = "stay"
         if arg_1 != 0:
             self.tape.rewind(arg_2)
-            action = f"jump to {arg_2}"
-        self._vprint(f"ADDR={addr}, JUMP-IF-TRUE, params: {(arg_1, arg_2)} {action}")
-        self._vprint(f"Tape: {self.tape}")
 
     def do_jump_if_false(self):
         """
         if the first parameter is zero, it sets the instruction pointer to the value
         from the second parameter. Otherwise, it does nothing.
         """
-        addr = self.tape.position
         arg_1 = self.read_param()
         arg_2 = self.read_param()
-        action = "stay"
         if arg_1 == 0:
             self.tape.rewind(arg_2)
-            action = f"jump to {arg_2}"
-        self._vprint(f"ADDR={addr}, JUMP-IF-FALSE, params: {(arg_1, arg_2)} {action}")
-        self._vprint(f"Tape: {self.tape}")
 
     def read_param(self, immediate=False):
         """
@@ -306,11 +660,10 @@ class Interpreter(object):
         but rather the value itself. In other words, it forbids the interpretation
         of the value in the positional mode.
         """
-        addr = self.tape.position
-        self._vprint(f"ADDR={addr}, READ-PARAM, param modes: {self.param_modes}")
 
         val   = self.tape.read()
-        pmode = self.pop_param_mode(0)
+        pmode = self.param_modes[self.param_index]
+        self.param_index += 1
 
         if pmode == 2:
             val += self.relative_base
@@ -320,8 +673,6 @@ class Interpreter(object):
         else:
             val = self.tape.at(val)
 
-        self._vprint(f"ADDR={addr}, READ-PARAM, value to return: {val}")
-
         return val
 
     def pop_param_mode(self, otherwise):
@@ -329,12 +680,14 @@ class Interpreter(object):
         Retrieves next parameter mode, if available, otherwise returns provided
         value <otherwise>.
 
-        Watch out: once the value was retrieved, it is deleted from the list of
-        parameter modes. Therefore, it should be used only once for each parameter.
+        Watch out: once the value was retrieved, the next call returns the mode
+        of the next parameter. Therefore, it should be used only once for each
+        parameter.
         """
 
-        if len(self.param_modes) > 0:
-            return self.param_modes.pop(0)
+        if self.param_index < len(self.param_modes):
+            self.param_index += 1
+            return self.param_modes[self.param_index-1]
 
         return otherwise
 
@@ -0,0 +1,155 @@
+"""
+Memoization of pure Intcode runs.
+
+A run is pure when the program gets all its inputs upfront, that is, it does
+not read inputs that depend on its outputs (unlike, for example, the arcade
+game). Then the outputs depend only on the program and the inputs, and can be
+looked up instead of being computed again. Pure runs of day 19 drone program
+are an example: it maps a point (x, y) to 0 or 1.
+
+RunCache keeps recent results in memory (LRU with a size limit) and, if given
+a path, also in an sqlite database that survives restarts. The program is
+identified by the hash of its text.
+"""
+
+import sqlite3
+from collections import OrderedDict
+
+from .tape import Tape
+from .image import text_hash
+from .fast_interpreter import FastInterpreter
+
+def program_digest(tape):
+    """
+    Hash of the program on the tape, as a hex string.
+    """
+    return text_hash(tape.dumps()).hex()
+
+class RunCache(object):
+    """
+    >>> cache = RunCache(maxsize=2)
+    >>> tape = Tape("3,12,3,13,2,12,13,14,4,14,99,0,0,0,0")
+    >>> cache.run(tape, [2, 3]), cache.run(tape, [4, 5]), cache.run(tape, [2, 3])
+    ((6,), (20,), (6,))
+    >>> cache.stats
+    {'hits': 1, 'misses': 2, 'disk_hits': 0}
+
+    The least recently used result gets evicted from memory
+
+    >>> _ = cache.run(tape, [6, 7])
+    >>> len(cache), (program_digest(tape), (4, 5)) in cache.memory
+    (2, False)
+
+    Results are also stored on disk if there is a path to the database
+
+    >>> import os, tempfile
+    >>> tmpdir = tempfile.TemporaryDirectory()
+    >>> path = os.path.join(tmpdir.name, "runs.sqlite")
+    >>> with RunCache(path=path) as cache:
+    ...     cache.run(tape, [2, 3])
+    (6,)
+    >>> with RunCache(path=path) as cache:
+    ...     cache.run(tape, [2, 3]), cache.stats
+    ((6,), {'hits': 1, 'misses': 0, 'disk_hits': 1})
+    >>> tmpdir.cleanup()
+
+    A program that reads more inputs than given is not a pure run
+
+    >>> RunCache().run(Tape("3,0,3,0,4,0,99"), [1])
+    Traceback (most recent call last):
+    ...
+    ValueError: Program needs more inputs than given: [1]
+    """
+
+    COMMIT_EVERY = 1000
+
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.memory = OrderedDict() # (program digest, inputs) -> outputs
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0}
+        self.db = None
+        self._pending = 0
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS runs "
+                            "(program TEXT, inputs TEXT, outputs TEXT, "
+                            "PRIMARY KEY (program, inputs))")
+
+    def __len__(self):
+        return len(self.memory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+
+    def run(self, tape, inputs, interpreter=FastInterpreter, digest=None):
+        """
+        Return outputs (as a tuple) of the program on <tape> run on given
+        <inputs>, from the cache if possible. A program that reads more inputs
+        than given raises ValueError. Computing the hash of the program takes time:
+        callers that run the same program many times should pass its
+        <digest> (see program_digest()).
+        """
+        key = (digest or program_digest(tape), tuple(inputs))
+        outputs = self.get(key)
+        if outputs is None:
+            self.stats["misses"] += 1
+            outputs = []
+            computer = interpreter(Tape(tape), inputs=list(inputs), outputs=outputs)
+            if computer.run_until() != computer.HALTED:
+                raise ValueError(f"Program needs more inputs than given: {list(inputs)}")
+            outputs = tuple(outputs)
+            self.put(key, outputs)
+        return outputs
+
+    def get(self, key):
+        """
+        Return outputs stored for given <key> (program digest, inputs) or None.
+        """
+        outputs = self.memory.get(key)
+        if outputs is not None:
+            self.memory.move_to_end(key)
+            self.stats["hits"] += 1
+            return outputs
+
+        if self.db is not None:
+            row = self.db.execute("SELECT outputs FROM runs WHERE program=? AND inputs=?",
+                                  (key[0], self._dumps(key[1]))).fetchone()
+            if row is not None:
+                outputs = self._loads(row[0])
+                self._remember(key, outputs)
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                return outputs
+
+        return None
+
+    def put(self, key, outputs):
+        self._remember(key, outputs)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?)",
+                            (key[0], self._dumps(key[1]), self._dumps(outputs)))
+            self._pending += 1
+            if self._pending >= self.COMMIT_EVERY:
+                self.db.commit()
+                self._pending = 0
+
+    def _remember(self, key, outputs):
+        self.memory[key] = outputs
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def _dumps(self, values):
+        return ",".join(map(str, values))
+
+    def _loads(self, s):
+        return tuple(int(v) for v in s.split(",")) if s else ()
@@ -0,0 +1,246 @@
+"""
+Networks of Intcode machines that exchange addressed packets.
+
+Every machine has a network address, that it gets as its first input when it
+boots. A machine sends a packet by outputting three values: the destination
+address, X and Y. The packet is delivered to the mailbox of the destination
+machine, where it waits to be read as two input values X and Y. A machine
+that reads from its empty mailbox gets -1 and continues running.
+
+Scheduler runs all machines in one thread, round robin, each for at most
+<budget> instructions at a time, and routes packets between rounds of
+machines. Packets to addresses without a machine are given to <on_packet>
+or collected in <unrouted>. The network is idle when all mailboxes are empty
+and every machine has been reading -1 for a while; <on_idle> decides then
+whether to continue (e.g. by sending a packet to some machine).
+
+    net = Scheduler(tape, 50, on_packet=nat.receive, on_idle=nat.wake_up)
+    net.run()
+"""
+
+import time
+
+from .tape import Tape
+from .channel import Channel
+from .fast_interpreter import FastInterpreter
+
+class Mailbox(Channel):
+    """
+    Inputs of a machine in the network. Reading from an empty mailbox gives
+    -1 instead of waiting for input, and an empty mailbox still tells the
+    interpreter that it has input.
+
+    >>> box = Mailbox([7])
+    >>> box.popleft(), box.popleft(), box.popleft()
+    (7, -1, -1)
+    >>> bool(box), len(box), box.empty_reads
+    (True, 0, 2)
+    """
+
+    EMPTY = -1
+
+    def __init__(self, values=()):
+        super().__init__(values)
+        self.empty_reads = 0 # reads from the empty mailbox since the last value
+
+    def popleft(self):
+        if self._queue:
+            self.empty_reads = 0
+            return self._queue.popleft()
+        self.empty_reads += 1
+        return self.EMPTY
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return f"Mailbox({list(self._queue)})"
+
+class Scheduler(object):
+    """
+    Three machines pass packets around in a ring: every machine sends one
+    packet with Y=0 to the next one and forwards packets it gets, adding 1
+    to Y, until Y reaches 5.
+
+    >>> ring = ("3,200,1001,200,1,203,1008,203,{size},204,1006,204,17,"
+    ...         "1101,0,0,203,1101,0,0,202,1105,1,46,3,201,1008,201,-1,204,"
+    ...         "1005,204,24,3,202,1007,202,{limit},204,1006,204,24,"
+    ...         "1001,202,1,202,4,203,4,200,4,202,1105,1,24")
+    >>> net = Scheduler(ring.format(size=3, limit=5), 3, budget=100)
+    >>> net.run()
+    'IDLE'
+    >>> net.stats["packets"], net.stats["max_depth"]
+    (18, 3)
+
+    Packets to unknown addresses are collected
+
+    >>> net = Scheduler("104,255,104,1,104,2,99", 1)
+    >>> net.run(), net.unrouted
+    ('HALTED', [(255, 1, 2)])
+
+    The network may be woken up when it is idle
+
+    >>> net = Scheduler(ring.format(size=2, limit=1), 2)
+    >>> net.send(0, 9, 0)
+    >>> def wake_up(net):
+    ...     if net.stats["idle"] < 3:
+    ...         net.send(0, 42, 0)
+    ...         return True
+    >>> net.on_idle = wake_up
+    >>> net.run(), net.stats["idle"]
+    ('IDLE', 3)
+    >>> net.stats["packets"]
+    10
+    """
+
+    # reasons for run() to stop
+    HALTED  = "HALTED"  # all machines have halted
+    IDLE    = "IDLE"    # the network is idle and on_idle has not woken it up
+    STOPPED = "STOPPED" # stop() has been called
+    ROUNDS  = "ROUNDS"  # the limit on the number of rounds has been reached
+
+    def __init__(self, tape=None, size=0, budget=1000, idle_reads=2,
+                 on_packet=None, on_idle=None, interpreter=FastInterpreter):
+        """
+        Boot <size> machines with addresses 0..size-1 that run the program on
+        <tape> with given <interpreter>. More machines can be added with add().
+
+        budget     -- max number of instructions a machine executes at once
+        idle_reads -- number of consecutive reads from the empty mailbox after
+                      which the machine is considered idle
+        on_packet  -- function (dest, x, y) that gets packets to addresses
+                      without a machine
+        on_idle    -- function (scheduler) called when the network is idle,
+                      that returns True if the network should continue
+        """
+        self.budget = budget
+        self.idle_reads = idle_reads
+        self.on_packet = on_packet
+        self.on_idle = on_idle
+
+        self.machines = {}  # address -> computer
+        self.mailboxes = {} # address -> Mailbox
+        self.unrouted = []  # (dest, x, y) packets to addresses without a machine
+        self.depths = {}    # address -> max number of packets in the mailbox
+        self.stats = {"rounds": 0, "steps": 0, "packets": 0, "unrouted": 0,
+                      "idle": 0, "max_depth": 0, "seconds": 0.0,
+                      "steps_per_second": 0.0}
+        self._stopped = False
+
+        if tape is not None:
+            tape = Tape(tape) if isinstance(tape, str) else tape
+            for address in range(size):
+                self.add(interpreter(Tape(tape)), address)
+
+    def add(self, computer, address):
+        """
+        Connect given <computer> to the network under given <address>. The
+        computer gets the address as its first input.
+        """
+        if address in self.machines:
+            raise ValueError(f"Address {address} is already taken")
+        computer.inputs = self.mailboxes[address] = Mailbox([address])
+        computer.outputs = Channel()
+        self.machines[address] = computer
+        self.depths[address] = 0
+
+    def send(self, dest, x, y):
+        """
+        Deliver packet (x, y) to the machine at address <dest>.
+        """
+        mailbox = self.mailboxes.get(dest)
+        if mailbox is None:
+            self.stats["unrouted"] += 1
+            if self.on_packet is None:
+                self.unrouted.append((dest, x, y))
+            else:
+                self.on_packet(dest, x, y)
+            return
+
+        self.stats["packets"] += 1
+        mailbox.extend((x, y))
+        depth = len(mailbox) >> 1
+        if depth > self.depths[dest]:
+            self.depths[dest] = depth
+            if depth > self.stats["max_depth"]:
+                self.stats["max_depth"] = depth
+
+    def stop(self):
+        """
+        Make run() return after the machine that is running now.
+        """
+        self._stopped = True
+
+    @property
+    def queued(self):
+        """
+        Number of packets waiting in all mailboxes.
+        """
+        return sum(len(mailbox) >> 1 for mailbox in self.mailboxes.values())
+
+    def run(self, max_rounds=None):
+        """
+        Run machines round robin until all of them halt, the network becomes
+        idle (and on_idle does not wake it up), stop() is called or
+        <max_rounds> rounds have been executed. Return the reason.
+        """
+        self._stopped = False
+        stats = self.stats
+        budget = self.budget
+        send = self.send
+        rounds = 0
+        reason = None
+        started = time.perf_counter()
+
+        machines = list(self.machines.items())
+        while reason is None:
+            if max_rounds is not None and rounds >= max_rounds:
+                reason = self.ROUNDS
+                break
+            rounds += 1
+
+            alive = False
+            for address, computer in machines:
+                if computer.running == -1:
+                    continue
+
+                num_steps = computer.num_steps
+                if computer.run_until(steps=budget) != computer.HALTED:
+                    alive = True
+                stats["steps"] += computer.num_steps - num_steps
+
+                outputs = computer.outputs
+                if len(outputs) >= 3:
+                    # sending a packet is activity
+                    self.mailboxes[address].empty_reads = 0
+                    while len(outputs) >= 3:
+                        send(*outputs.drain(3))
+
+                if self._stopped:
+                    reason = self.STOPPED
+                    break
+
+            if reason is not None:
+                break
+            if not alive:
+                reason = self.HALTED
+            elif self._idle():
+                stats["idle"] += 1
+                if self.on_idle is None or not self.on_idle(self):
+                    reason = self.IDLE
+
+        stats["rounds"] += rounds
+        stats["seconds"] += time.perf_counter() - started
+        if stats["seconds"]:
+            stats["steps_per_second"] = stats["steps"] / stats["seconds"]
+
+        return reason
+
+    def _idle(self):
+        for address, computer in self.machines.items():
+            if computer.running == -1:
+                continue
+            mailbox = self.mailboxes[address]
+            if len(mailbox) or mailbox.empty_reads < self.idle_reads or computer.outputs:
+                return False
+        return True
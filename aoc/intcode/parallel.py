@@ -0,0 +1,110 @@
+"""
+Running one Intcode program over many independent inputs on several cores.
+
+map_runs() starts a pool of worker processes and ships the parsed program to
+every worker once, when the worker starts. Runs are then sent to the workers
+as small jobs: the inputs of the run and, optionally, corrections to patch
+into the program before running it (see Tape.patch).
+
+    for res in map_runs(tape, ([x,y] for x,y in points), workers=4):
+        print(res.index, res.outputs)
+"""
+
+import multiprocessing
+import time
+from collections import namedtuple
+
+from .tape import Tape
+from .fast_interpreter import FastInterpreter
+
+Run = namedtuple("Run", ["inputs", "patch"])
+Run.__new__.__defaults__ = ((), None)
+Run.__doc__ = """
+One run of the program: values to input and corrections to patch into the
+program (or None).
+"""
+
+RunResult = namedtuple("RunResult", ["index", "outputs", "value"])
+RunResult.__doc__ = """
+Result of the run number <index>: values output by the program and the value
+at address 0 after the program has halted.
+"""
+
+# the program and the interpreter class of a worker process
+_program = None
+_interpreter = None
+
+def _init_worker(program, interpreter):
+    global _program, _interpreter
+    _program = program
+    _interpreter = interpreter
+
+def _execute(job):
+    index, run = job
+    if not isinstance(run, Run):
+        run = Run(run)
+    tape = Tape(_program)
+    if run.patch is not None:
+        tape.patch(run.patch)
+    outputs = []
+    computer = _interpreter(tape, inputs=list(run.inputs), outputs=outputs)
+    computer.execute()
+    return RunResult(index, outputs, tape.at(0))
+
+def map_runs(tape, inputs_iter, workers=None, chunksize=64, ordered=True,
+             interpreter=FastInterpreter, stats=None):
+    """
+    Run the program on <tape> once per item of <inputs_iter> and generate
+    RunResults. An item is either a list of inputs or a Run.
+
+    workers     -- number of worker processes, all cores if None. With 1,
+                   the runs are executed in this process.
+    chunksize   -- number of runs sent to a worker at once
+    ordered     -- generate results in the order of inputs if True, in the
+                   order of completion otherwise
+    interpreter -- class of the computer to run the program with
+    stats       -- dictionary that receives the number of runs, the time
+                   elapsed and the throughput (runs_per_second) when all
+                   runs have been completed
+
+    >>> s = "3,9,3,10,2,9,10,0,99,0,0"
+    >>> stats = {}
+    >>> [res.value for res in map_runs(s, [[2, 3], [4, 5], [6, 7]], workers=2, stats=stats)]
+    [6, 20, 42]
+    >>> stats["runs"]
+    3
+    >>> s = "1,0,0,0,99"
+    >>> [res.value for res in map_runs(s, [Run(patch=(n, 0)) for n in range(3)], workers=1)]
+    [2, 2, 1]
+
+    The whole memory of the tape is shipped, sparse memory as well
+
+    >>> tape = Tape("4,1000000,99")
+    >>> tape.write_to(10**6, 7)
+    >>> [res.outputs for res in map_runs(tape, [[]], workers=2)]
+    [[7]]
+    """
+    # a copy of the tape, with dense memory and sparse pages, is pickled
+    # and sent to every worker
+    program = Tape(tape)
+    jobs = enumerate(inputs_iter)
+    count = 0
+    started = time.perf_counter()
+
+    if workers == 1:
+        _init_worker(program, interpreter)
+        for res in map(_execute, jobs):
+            count += 1
+            yield res
+    else:
+        with multiprocessing.Pool(workers, _init_worker, (program, interpreter)) as pool:
+            run = pool.imap if ordered else pool.imap_unordered
+            for res in run(_execute, jobs, chunksize):
+                count += 1
+                yield res
+
+    if stats is not None:
+        elapsed = time.perf_counter() - started
+        stats["runs"] = count
+        stats["elapsed"] = elapsed
+        stats["runs_per_second"] = count / elapsed if elapsed else 0.0
@@ -0,0 +1,131 @@
+"""
+Profiling of Intcode programs.
+
+Profiler is a Tracer that, instead of reporting executed instructions, counts
+them: per opcode, per address, per jump target. It also counts I/O events and
+measures wall time between them. Being a Tracer, it costs nothing unless it is
+attached to an Interpreter.
+
+    profiler = computer.profile() # or Profiler().attach(computer)
+    computer.execute()
+    print(profiler.heatmap(computer.tape))
+    print(profiler.to_json())
+"""
+
+import json
+import time
+from collections import Counter
+
+from .decoder import MNEMONICS, decode, format_instruction
+from .tracing import Tracer, ALL
+
+class Profiler(Tracer):
+    """
+    >>> from .interpreter import Interpreter
+    >>> s = "1101,0,3,20,4,20,1001,20,-1,20,1005,20,4,99"
+    >>> computer = Interpreter(s, outputs=[])
+    >>> profiler = Profiler().attach(computer)
+    >>> _ = computer.execute()
+    >>> computer.outputs
+    [3, 2, 1]
+    >>> profiler.total
+    11
+    >>> profiler.by_opcode[4], profiler.by_address[10], profiler.jump_targets[4]
+    (3, 3, 2)
+    >>> profiler.io_events
+    Counter({'output': 3})
+    >>> print(profiler.heatmap(computer.tape, width=10))
+       0        1 ###        SUM 0, 3, [20]
+       4        3 ########## OUTPUT [20]
+       6        3 ########## SUM [20], -1, [20]
+      10        3 ########## JUMP-IF-TRUE [20], 4
+      13        1 ###        HALT
+    >>> report = json.loads(profiler.to_json())
+    >>> report["by_opcode"]["OUTPUT"], report["by_address"]["10"]
+    (3, 3)
+    """
+
+    def __init__(self):
+        super().__init__(self.record, ALL)
+        self.computer = None
+        self.by_opcode = Counter()
+        self.by_address = Counter()
+        self.jump_targets = Counter()
+        self.io_events = Counter()   # input, output
+        self.io_waits = 0            # times the computer suspended waiting for host
+        self.io_gaps = []            # wall time between consecutive I/O events
+        self._last_io = None
+
+    def attach(self, computer):
+        """
+        Start profiling given <computer>. Replaces the tracer of the computer.
+        """
+        self.computer = computer
+        computer.tracer = self
+        return self
+
+    def detach(self):
+        if self.computer is not None and self.computer.tracer is self:
+            self.computer.tracer = None
+        self.computer = None
+        return self
+
+    @property
+    def total(self):
+        return sum(self.by_opcode.values())
+
+    def record(self, record):
+        op = record.opcode
+        self.by_opcode[op] += 1
+        self.by_address[record.address] += 1
+
+        if op == 5 or op == 6:
+            if record.result != record.address + 3:
+                self.jump_targets[record.result] += 1
+
+        elif op == 3 or op == 4:
+            now = time.perf_counter()
+            if self._last_io is not None:
+                self.io_gaps.append(now - self._last_io)
+            self._last_io = now
+            self.io_events["input" if op == 3 else "output"] += 1
+            if op == 4 and self.computer is not None and self.computer.uplink is not None:
+                self.io_waits += 1
+
+    def summary(self):
+        """
+        Collected statistics as a dictionary.
+        """
+        gaps = self.io_gaps
+        return {
+            "total": self.total,
+            "by_opcode": { MNEMONICS[op]: n for op, n in self.by_opcode.most_common() },
+            "by_address": { str(a): n for a, n in sorted(self.by_address.items()) },
+            "jump_targets": { str(a): n for a, n in self.jump_targets.most_common() },
+            "io_events": dict(self.io_events),
+            "io_waits": self.io_waits,
+            "io_gaps": {
+                "count": len(gaps),
+                "total": sum(gaps),
+                "max": max(gaps, default=0.0),
+                "mean": sum(gaps)/len(gaps) if gaps else 0.0,
+            },
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.summary(), **kwargs)
+
+    def heatmap(self, tape, width=40):
+        """
+        Text heat map: executed instructions in the order of their addresses,
+        each with the execution count and a bar proportional to it.
+        Instructions that were never executed are not shown.
+        """
+        lines = []
+        top = max(self.by_address.values(), default=1)
+        for addr, count in sorted(self.by_address.items()):
+            instr = decode(tape.at(addr))
+            words = [tape.at(a) for a in range(addr, addr + 1 + instr.arity)]
+            bar = "#" * max(1, round(width * count / top))
+            lines.append(f"{addr:>4} {count:>8} {bar:<{width}} {format_instruction(words)}")
+        return "\n".join(lines)
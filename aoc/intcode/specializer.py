@@ -0,0 +1,398 @@
+"""
+Specialization of Intcode programs to what is known about their runs.
+
+Day 19 runs the same program many times, only the two input values change.
+Specializer executes the program once, symbolically: inputs and cells of
+memory that are not known in advance are variables, everything else is a
+known value. Computations on known values are done right away (constant
+folding) and only computations that involve variables are emitted as code of
+a residual Python function. A conditional jump on a known value just goes
+on, one on a variable becomes if/else in the residual function, each branch
+specialized separately, so branches that can not be taken are not there.
+
+    drone = Specializer(tape, inputs=[None, None]) # both inputs are variable
+    outputs, _ = drone(x, y)
+
+The residual function takes the variable inputs, then the variable cells, and
+returns the list of outputs and the value at address 0 at the end of the run.
+
+Where specialization can not go on, the residual function falls back to the
+interpreter: it rebuilds the memory as it is at that point (a snapshot of the
+known cells and the values of variable ones) and resumes the program there.
+This happens
+  - at a jump on variables that has already been split <unroll> times on the
+    path, i.e. on loops and recursion whose condition depends on variables,
+  - when the program computes from variables an address it reads or writes,
+    the target of a jump, the relative base or its own code,
+  - when specialization needs more paths or instructions than allowed.
+Addresses of fallbacks and their reasons are listed in <fallbacks>.
+"""
+
+from .tape import Tape
+from .decoder import DECODE_TABLE, WRITES, IMMEDIATE, RELATIVE
+from .fast_interpreter import FastInterpreter
+
+class SpecializationError(Exception):
+    pass
+
+class Fallback(Exception):
+    """
+    Raised by the symbolic execution of an instruction that can not be
+    specialized. The residual function resumes the interpreter at it.
+    """
+    pass
+
+class Specializer(object):
+    """
+    The program reads x, y and outputs 1 if 3*x < y, otherwise 0; the loop at
+    the beginning does not depend on inputs and disappears
+
+    >>> s = "1101,5,0,40,1001,40,-1,40,1005,40,4,3,41,3,42,1002,41,3,43,7,43,42,44,1005,44,29,104,0,99,104,1,99"
+    >>> spec = Specializer(s, inputs=[None, None])
+    >>> print(spec.source)
+    def residual(i0, i1):
+        out = []
+        t0 = i0 * 3
+        t1 = 1 if t0 < i1 else 0
+        if t1 != 0:
+            out.append(1)
+            return out, 1101
+        else:
+            out.append(0)
+            return out, 1101
+    >>> spec(2, 7), spec(3, 7)
+    (([1], 1101), ([0], 1101))
+    >>> spec.stats["folded"], spec.stats["residual"], spec.stats["paths"]
+    (11, 4, 2)
+
+    Results are checked against the interpreter
+
+    >>> spec.check([(x, y) for x in range(5) for y in range(10)])
+    True
+
+    Known inputs and variable cells
+
+    >>> spec = Specializer("1,0,13,0,3,12,2,0,12,0,99,0,0,0", inputs=[4], variable=[13])
+    >>> spec.params, spec(4), spec.fallbacks
+    (['c13'], ([], 20), [])
+
+    The loop that counts down from the input is unrolled twice, the rest of
+    it is left to the interpreter
+
+    >>> spec = Specializer("3,20,4,20,1001,20,-1,20,1005,20,2,99", inputs=[None], unroll=2)
+    >>> print(spec.source)
+    def residual(i0):
+        out = []
+        out.append(i0)
+        t0 = i0 + -1
+        if t0 != 0:
+            out.append(t0)
+            t1 = t0 + -1
+            if t1 != 0:
+                out.append(t1)
+                t2 = t1 + -1
+                return resume(0, 8, 0, {20: t2}, [], out)
+            else:
+                return out, 3
+        else:
+            return out, 3
+    >>> spec(5), spec.fallbacks
+    (([5, 4, 3, 2, 1], 3), [(8, 'loop on variables')])
+    >>> spec.check([(n,) for n in range(1, 10)])
+    True
+
+    Every check of the input below nests the rest of the program one level
+    deeper, nesting is cut off and the rest is left to the interpreter
+
+    >>> checks = [[1008, 1000, k, 1001, 1005, 1001, 842] for k in range(120)]
+    >>> words = [3, 1000] + sum(checks, []) + [104, 1, 99] + [0] * 157
+    >>> spec = Specializer(",".join(map(str, words)), inputs=[None])
+    >>> spec.fallbacks[0]
+    (356, 'more than 50 nested branches')
+    >>> spec.check([(n,) for n in range(0, 130, 7)])
+    True
+
+    >>> Specializer("3,0,3,1,99", inputs=[None])
+    Traceback (most recent call last):
+    ...
+    aoc.intcode.specializer.SpecializationError: Address 2: the program reads more inputs than given
+    """
+
+    def __init__(self, tape, inputs=(), variable=(), unroll=1, max_paths=256,
+                 max_steps=1000000, max_depth=50, interpreter=FastInterpreter):
+        """
+        inputs      -- values of inputs of the program in the order they are
+                       read, None for a value that is not known in advance
+        variable    -- addresses of cells whose values are not known in advance
+        unroll      -- number of times a jump on variables may be split on
+                       one path
+        max_paths   -- max number of paths through the program (branches of
+                       the residual function)
+        max_steps   -- max number of instructions executed on all paths
+        max_depth   -- max number of nested branches on one path (Python
+                       allows up to 100 levels of indentation)
+        interpreter -- class of the computer that fallbacks resume
+        """
+        tape = Tape(tape) if isinstance(tape, str) else tape
+        self.tape = tape
+        self.base = list(tape.cells)
+        self.inputs = list(inputs)
+        self.variable = list(variable)
+        self.unroll = unroll
+        self.max_paths = max_paths
+        self.max_steps = max_steps
+        self.max_depth = max_depth
+        self.interpreter = interpreter
+
+        self.params = [f"i{n}" for n, v in enumerate(self.inputs) if v is None] \
+                    + [f"c{addr}" for addr in self.variable]
+        self.stats = {"folded": 0, "residual": 0, "paths": 0, "steps": 0}
+        self.fallbacks = []   # (address, reason)
+        self._snapshots = {}  # known memory at a fallback -> its number
+        self._temps = 0
+        self._splits = 0
+        self._lines = [f"def residual({', '.join(self.params)}):", "    out = []"]
+
+        mem = {addr: f"c{addr}" for addr in self.variable}
+        self._walk(0, 0, mem, 0, 1, {})
+
+        self.source = "\n".join(self._lines)
+        self._snapshots = [list(cells) for cells in self._snapshots]
+        namespace = {"resume": self._resume}
+        exec(compile(self.source, "<specialized intcode>", "exec"), namespace)
+        self.function = namespace["residual"]
+
+    def __call__(self, *args):
+        return self.function(*args)
+
+    def check(self, samples):
+        """
+        Run the residual function and the program on the interpreter on every
+        tuple of arguments from <samples> and compare outputs and values at
+        address 0. Raise ValueError on the first difference, return True if
+        there is none.
+        """
+        for args in samples:
+            args = list(args)
+            inputs, cells = [], {}
+            for value in self.inputs:
+                inputs.append(args.pop(0) if value is None else value)
+            for addr in self.variable:
+                cells[addr] = args.pop(0)
+
+            tape = Tape(self.tape)
+            for addr, value in cells.items():
+                tape.write_to(addr, value)
+            outputs = []
+            self.interpreter(tape, inputs=list(inputs), outputs=outputs).execute()
+            expected = (outputs, tape.at(0))
+
+            got = self.function(*self._arguments(inputs, cells))
+            if got != expected:
+                raise ValueError(f"Specialized program differs on {inputs}, {cells}: "
+                                 f"{got} instead of {expected}")
+        return True
+
+    def _arguments(self, inputs, cells):
+        """
+        Arguments of the residual function for a run with given <inputs> and
+        values of variable <cells>.
+        """
+        return [value for value, known in zip(inputs, self.inputs) if known is None] \
+             + [cells[addr] for addr in self.variable]
+
+    def _resume(self, snapshot, pc, rb, cells, inputs, out):
+        """
+        Fallback of the residual function: run the program from address <pc>
+        with relative base <rb> in the memory of given <snapshot> with values
+        of variable <cells> written into it.
+        """
+        tape = Tape()
+        tape.cells = list(self._snapshots[snapshot])
+        for addr, value in cells.items():
+            tape.cells[addr] = value
+        tape.position = pc
+        computer = self.interpreter(tape, inputs=inputs, outputs=out)
+        computer.relative_base = rb
+        computer.running = 1
+        computer.execute()
+        return out, tape.at(0)
+
+    def _emit(self, indent, line):
+        self._lines.append("    " * indent + line)
+
+    def _temp(self, indent, expr):
+        name = f"t{self._temps}"
+        self._temps += 1
+        self._emit(indent, f"{name} = {expr}")
+        self.stats["residual"] += 1
+        return name
+
+    def _read(self, mem, addr, what="reading from"):
+        if not isinstance(addr, int):
+            raise Fallback(f"{what} an address computed from variables")
+        if addr < 0:
+            raise SpecializationError(f"{what} negative address {addr}")
+        if addr in mem:
+            return mem[addr]
+        return self.base[addr] if addr < len(self.base) else 0
+
+    def _walk(self, pc, rb, mem, num_inputs, indent, splits):
+        """
+        Execute the program symbolically from address <pc> with relative
+        base <rb>, memory <mem> (cells that differ from the program) after
+        <num_inputs> inputs have been read. Emit the residual code of the
+        rest of the run, indented by <indent> levels. <splits> tells how many
+        times jumps have been split on the path so far.
+        """
+        while pc is not None:
+            try:
+                pc, rb, num_inputs = self._step(pc, rb, mem, num_inputs, indent, splits)
+            except Fallback as e:
+                self._fall_back(pc, rb, mem, num_inputs, indent, str(e))
+                return
+            except SpecializationError as e:
+                raise SpecializationError(f"Address {pc}: {e}") from None
+
+    def _step(self, pc, rb, mem, num_inputs, indent, splits):
+        """
+        Execute the instruction at <pc> symbolically. Return the address of
+        the next one (None at the end of the path), relative base and number
+        of inputs read. Memory is not changed if Fallback is raised.
+        """
+        self.stats["steps"] += 1
+        if self.stats["steps"] > self.max_steps:
+            raise Fallback(f"more than {self.max_steps} instructions")
+
+        word = self._read(mem, pc, "executing code from")
+        if not isinstance(word, int):
+            raise Fallback("executing code computed from variables")
+        instr = DECODE_TABLE[word] if 0 <= word < len(DECODE_TABLE) else None
+        if instr is None:
+            raise SpecializationError(f"unknown instruction {word}")
+        op, modes = instr.opcode, instr.modes
+
+        raw = [self._read(mem, pc + 1 + k) for k in range(instr.arity)]
+        addrs = []
+        for p, m in zip(raw, modes):
+            if m == IMMEDIATE:
+                addrs.append(None)
+            elif not isinstance(p, int):
+                raise Fallback("reading from an address computed from variables")
+            else:
+                addrs.append(p + rb if m == RELATIVE else p)
+
+        def value(k):
+            return raw[k] if addrs[k] is None else self._read(mem, addrs[k])
+
+        if op == 99:
+            self.stats["paths"] += 1
+            self._emit(indent, f"return out, {self._read(mem, 0)}")
+            return None, rb, num_inputs
+
+        if op in WRITES:
+            target = addrs[WRITES[op]]
+            if target is None:
+                raise SpecializationError("writing to an immediate parameter")
+            if target < 0:
+                raise SpecializationError(f"writing to negative address {target}")
+
+        if op == 3:
+            if num_inputs >= len(self.inputs):
+                raise SpecializationError("the program reads more inputs than given")
+            val = self.inputs[num_inputs]
+            mem[target] = f"i{num_inputs}" if val is None else val
+            return pc + 2, rb, num_inputs + 1
+
+        if op == 4:
+            self._emit(indent, f"out.append({value(0)})")
+            self.stats["residual"] += 1
+            return pc + 2, rb, num_inputs
+
+        if op == 9:
+            val = value(0)
+            if not isinstance(val, int):
+                raise Fallback("relative base computed from variables")
+            self.stats["folded"] += 1
+            return pc + 2, rb + val, num_inputs
+
+        x, y = value(0), value(1)
+
+        if op == 5 or op == 6:
+            if not isinstance(y, int):
+                raise Fallback("jump to an address computed from variables")
+            if isinstance(x, int):
+                self.stats["folded"] += 1
+                return (y if (x != 0) == (op == 5) else pc + 3), rb, num_inputs
+
+            if splits.get(pc, 0) >= self.unroll:
+                raise Fallback("loop on variables")
+            if self._splits + 1 >= self.max_paths:
+                raise Fallback(f"more than {self.max_paths} paths")
+            if indent > self.max_depth:
+                raise Fallback(f"more than {self.max_depth} nested branches")
+            self._splits += 1
+            splits = dict(splits)
+            splits[pc] = splits.get(pc, 0) + 1
+
+            taken, other = (y, pc + 3) if op == 5 else (pc + 3, y)
+            self._emit(indent, f"if {x} != 0:")
+            self._walk(taken, rb, dict(mem), num_inputs, indent + 1, splits)
+            self._emit(indent, "else:")
+            self._walk(other, rb, dict(mem), num_inputs, indent + 1, splits)
+            return None, rb, num_inputs
+
+        mem[target] = self._compute(op, x, y, indent)
+        return pc + 4, rb, num_inputs
+
+    def _fall_back(self, pc, rb, mem, num_inputs, indent, reason):
+        """
+        Emit the code that resumes the interpreter at <pc>.
+        """
+        known = {addr: val for addr, val in mem.items() if isinstance(val, int)}
+        cells = {addr: val for addr, val in mem.items() if not isinstance(val, int)}
+        size = max([len(self.base)] + [addr + 1 for addr in mem])
+        snapshot = self.base + [0] * (size - len(self.base))
+        for addr, val in known.items():
+            snapshot[addr] = val
+        snapshot = self._snapshots.setdefault(tuple(snapshot), len(self._snapshots))
+
+        inputs = [f"i{n}" if val is None else str(val)
+                  for n, val in enumerate(self.inputs) if n >= num_inputs]
+        cells = ", ".join(f"{addr}: {val}" for addr, val in sorted(cells.items()))
+        self._emit(indent, f"return resume({snapshot}, {pc}, {rb}, {{{cells}}}, "
+                           f"[{', '.join(inputs)}], out)")
+        self.stats["paths"] += 1
+        self.fallbacks.append((pc, reason))
+
+    def _compute(self, op, x, y, indent):
+        """
+        Result of arithmetic instruction <op> on <x> and <y>: a value if it is
+        known, otherwise the name of the temporary variable that holds it in
+        the residual function.
+        """
+        known = isinstance(x, int) and isinstance(y, int)
+        if op == 1:
+            if known:   val = x + y
+            elif x == 0: val = y
+            elif y == 0: val = x
+            else:       val = None; expr = f"{x} + {y}"
+        elif op == 2:
+            if known:             val = x * y
+            elif x == 0 or y == 0: val = 0
+            elif x == 1:          val = y
+            elif y == 1:          val = x
+            else:                 val = None; expr = f"{x} * {y}"
+        elif op == 7:
+            if known:    val = 1 if x < y else 0
+            elif x == y: val = 0
+            else:        val = None; expr = f"1 if {x} < {y} else 0"
+        else:
+            if known:    val = 1 if x == y else 0
+            elif x == y: val = 1
+            else:        val = None; expr = f"1 if {x} == {y} else 0"
+
+        if val is not None:
+            self.stats["folded"] += 1
+            return val
+        return self._temp(indent, expr)
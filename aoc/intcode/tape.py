@@ -1,5 +1,17 @@
-
 import sys
+from array import array
+from itertools import chain, islice
+
+from . import image
+
+PAGE_SHIFT = 8
+PAGE_SIZE  = 1 << PAGE_SHIFT
+PAGE_MASK  = PAGE_SIZE - 1
+ZERO_PAGE  = (0,) * PAGE_SIZE
+
+# Writing beyond the end of dense memory by at most this many cells extends
+# dense memory, writing farther stores the value in a sparse page.
+SPARSE_GAP = 16 * PAGE_SIZE
 
 class Tape(object):
     """
@@ -7,33 +19,284 @@ class Tape(object):
     >>> tape = Tape(prg)
     >>> tape.cells == [1, 0, 0, 3, 99]
     True
+
+    Memory of a tape consists of dense memory, a plain list of cells that holds
+    the program and whatever is written right after it, and sparse memory: pages
+    of PAGE_SIZE cells allocated on the first write to an address far beyond the
+    end of dense memory. Reading a cell that was never written returns 0 and
+    allocates nothing.
+
+    >>> tape = Tape("1,2,3")
+    >>> tape.at(10**8)
+    0
+    >>> len(tape), str(tape)
+    (3, '1,2,3')
+    >>> tape.write_to(10**8, 7)
+    >>> len(tape), len(tape.cells), tape.at(10**8)
+    (100000001, 3, 7)
+    >>> tape.write_to(5, 6)
+    >>> tape.dumps()[:12], tape.dumps()[-5:]
+    ('1,2,3,0,0,6,', '0,0,7')
+    >>> len(tape._pages)
+    1
+
+    After the tape has been forked (see fork()), all memory is kept in pages that
+    are shared with other tapes and copied on write. Accessing <cells> turns
+    the memory of the tape back into private dense memory.
+
+    With storage="array", dense memory is a compact array of 64-bit integers
+    instead of a list of Python ints. As soon as a value that does not fit in
+    64 bits gets stored, the tape switches to a list (storage="list").
+
+    >>> tape = Tape("1,0,0,3,99", storage="array")
+    >>> tape.cells
+    array('q', [1, 0, 0, 3, 99])
+    >>> tape.write_to(1, 2**70)
+    >>> tape.storage, tape.at(1)
+    ('list', 1180591620717411303424)
+    >>> str(tape)
+    '1,1180591620717411303424,0,3,99'
     """
 
+    STORAGES = ("list", "array")
+
     @classmethod
-    def read_from_file(cls, fname):
+    def read_from_file(cls, fname, storage=None, use_image=False):
+        """
+        Load the program from text file <fname>. If <use_image> is True, the
+        program is read from its binary image (see image.py) when it is fresh,
+        otherwise the text is parsed and the image written for the next time.
+        By default, no image is read or written.
+
+        >>> import os, tempfile
+        >>> tmpdir = tempfile.TemporaryDirectory()
+        >>> fname = os.path.join(tmpdir.name, "input.txt")
+        >>> with open(fname, "w") as fd: _ = fd.write("1,0,0,3,99\\n")
+        >>> str(Tape.read_from_file(fname)), os.path.exists(image.image_path(fname))
+        ('1,0,0,3,99', False)
+        >>> str(Tape.read_from_file(fname, use_image=True)), os.path.exists(image.image_path(fname))
+        ('1,0,0,3,99', True)
+        >>> Tape.read_from_file(fname, storage="array", use_image=True).cells
+        array('q', [1, 0, 0, 3, 99])
+        >>> tmpdir.cleanup()
+        """
         with open(fname) as fd:
             lines = fd.readlines()
         lines = [ line.strip() for line in lines ]
-        return cls(lines[0])
 
-    def __init__(self, s=None):
-        if isinstance(s, self.__class__):
-            self.cells = list(s.cells)
+        if not use_image:
+            return cls(lines[0], storage)
+
+        img = image.image_path(fname)
+        cells = image.read_image(img, lines[0], storage or "list")
+        if cells is not None:
+            tape = cls(storage=storage)
+            tape.cells = cells
+            return tape
+
+        tape = cls(lines[0], storage)
+        try:
+            image.write_image(img, lines[0], tape.cells)
+        except OSError:
+            pass
+        return tape
+
+    def __init__(self, s=None, storage=None):
+        self._pages = {}    # page index -> page (sparse memory or all memory if paged)
+        self._owned = set() # indices of pages not shared with other tapes
+        self._paged = False # True if all memory is in pages
+        self._dense = 0     # size of dense memory, if paged
+        self._end   = 0     # 1 + the largest address written in sparse memory
+        if isinstance(s, Tape):
+            self.storage = storage or s.storage
+            if s._paged:
+                self._cells = None
+                self._share_pages_of(s)
+            else:
+                self._copy_cells_of(s)
             self.position = s.position
         elif s is not None:
-            self.cells = [int(i) for i in s.split(',')]
+            self.storage = storage or "list"
+            self._cells = self._new_cells(int(i) for i in s.split(','))
             self.position = 0
         else:
-            self.cells = []
+            self.storage = storage or "list"
+            self._cells = self._new_cells([])
             self.position = 0
 
+        if self.storage not in self.STORAGES:
+            raise ValueError(f"Unknown storage: {self.storage}")
+
+    def _new_cells(self, values):
+        """
+        Create dense memory of the type required by <storage> from given
+        <values>. Fall back to a list if some value does not fit into an array.
+        """
+        if self.storage == "array":
+            if isinstance(values, array):
+                return array("q", values)
+            values = list(values)
+            try:
+                return array("q", values)
+            except OverflowError:
+                self.storage = "list"
+        return list(values)
+
+    def _promote(self):
+        """
+        Switch storage from array to list, to hold values of any size.
+        Returns new dense memory.
+        """
+        self.storage = "list"
+        if self._cells is not None:
+            self._cells = list(self._cells)
+        return self._cells
+
+    @property
+    def cells(self):
+        """
+        Dense memory of the tape as a list (or an array). If memory is paged,
+        it gets copied into private dense and sparse memory first.
+        """
+        if self._paged:
+            self._unpaginate()
+        return self._cells
+
+    @cells.setter
+    def cells(self, cells):
+        self._cells = cells
+        self._pages = {}
+        self._owned = set()
+        self._paged = False
+        self._end = 0
+
+    @property
+    def paged(self):
+        return self._paged
+
+    def __len__(self):
+        """
+        Size of the memory: 1 + the largest address written to.
+        """
+        dense = self._dense if self._paged else len(self._cells)
+        return max(dense, self._end)
+
+    def fork(self):
+        """
+        Return a copy of the tape that shares memory pages with this tape.
+        A page gets copied only when either of the tapes writes to it.
+
+        >>> t = Tape("1,2,3")
+        >>> k = t.fork()
+        >>> k.write_to(1, 20)
+        >>> str(t), str(k)
+        ('1,2,3', '1,20,3')
+        >>> t.paged, k.paged
+        (True, True)
+        >>> t._pages[0] is k._pages[0]
+        False
+
+        >>> t = Tape(",".join(["7"] * (3*PAGE_SIZE)))
+        >>> k = t.fork()
+        >>> k.write_to(PAGE_SIZE, 0)
+        >>> [t._pages[i] is k._pages[i] for i in range(3)]
+        [True, False, True]
+        """
+        return Tape(self._paginate())
+
+    def copy_from(self, other, share=True):
+        """
+        Make memory and position of this tape those of <other> tape, sharing
+        memory pages with it (see fork()). If <share> is False and memory of
+        <other> is not paged, dense memory is copied instead, which is faster
+        for small tapes and keeps both tapes unpaged.
+
+        >>> t = Tape("1,2,3")
+        >>> k = Tape("4,5")
+        >>> k.copy_from(t)
+        >>> k.write_to(0, 10)
+        >>> str(t), str(k)
+        ('1,2,3', '10,2,3')
+        >>> k.copy_from(Tape("7,8"), share=False)
+        >>> k.cells, k.paged
+        ([7, 8], False)
+        """
+        if share or other._paged:
+            self._share_pages_of(other)
+        else:
+            self._copy_cells_of(other)
+        self.position = other.position
+
+    def _paginate(self):
+        """
+        Move dense memory into pages (if not yet) and mark all pages as shared.
+        """
+        if not self._paged:
+            cells = self._cells
+            for idx, start in enumerate(range(0, len(cells), PAGE_SIZE)):
+                page = cells[start:start+PAGE_SIZE]
+                page.extend([0] * (PAGE_SIZE - len(page)))
+                self._pages[idx] = page
+            self._dense = len(cells)
+            self._cells = None
+            self._paged = True
+        self._owned = set()
+        return self
+
+    def _unpaginate(self):
+        """
+        Copy pages that make up dense memory into private dense memory.
+        The remaining pages stay sparse memory.
+        """
+        pages = self._pages
+        n = (self._dense + PAGE_MASK) >> PAGE_SHIFT
+        # the last page may also hold values written as sparse memory
+        size = min(n << PAGE_SHIFT, max(self._dense, self._end))
+        dense = chain.from_iterable(pages.get(idx, ZERO_PAGE) for idx in range(n))
+        self._cells = self._new_cells(islice(dense, size))
+        for idx in range(n):
+            pages.pop(idx, None)
+            self._owned.discard(idx)
+        self._paged = False
+
+    def _copy_cells_of(self, other):
+        """
+        Copy dense memory of unpaged <other> tape, sharing its sparse pages.
+        """
+        self._cells = self._new_cells(other._cells)
+        self._pages = dict(other._pages)
+        self._owned = set()
+        self._paged = False
+        self._dense = 0
+        self._end   = other._end
+        other._owned = set()
+
+    def _share_pages_of(self, other):
+        other._paginate()
+        self._cells = None
+        self._paged = True
+        self._pages = dict(other._pages)
+        self._owned = set()
+        self._dense = other._dense
+        self._end   = other._end
+
+    def _page_for_write(self, idx):
+        """
+        Return page at index <idx> making it private to this tape first.
+        """
+        if idx not in self._owned:
+            page = self._pages.get(idx)
+            self._pages[idx] = [0] * PAGE_SIZE if page is None else list(page)
+            self._owned.add(idx)
+        return self._pages[idx]
+
     def patch(self, corrections):
         """
         Correct values at the addresses #1 (noun) and #2 (verb) to be as provided
         in the list/tuple <corrections>
         """
         for pos,val in zip([1,2], corrections):
-            self.cells[pos] = val
+            self.write_to(pos, val)
 
     def rewind(self, address=0):
         """
@@ -75,13 +338,16 @@ class Tape(object):
         0
         """
         addr = self.position if addr is None else addr
+        cells = self._cells
+
+        if cells is not None and 0 <= addr < len(cells):
+            return cells[addr]
 
         if addr < 0:
             raise ValueError(f"Attempting to read tape at negative address: {addr}")
-        elif addr >= len(self.cells):
-            self._extend_tape_upto_address(addr)
 
-        return self.cells[addr]
+        page = self._pages.get(addr >> PAGE_SHIFT)
+        return 0 if page is None else page[addr & PAGE_MASK]
 
     def read(self):
         """
@@ -112,19 +378,85 @@ class Tape(object):
         >>> for i in range(0,3): t.write_to(i, (1+i)*10)
         >>> str(t)
         '10,20,30'
+        >>> t.write_to(4, 50)
+        >>> t.cells
+        [10, 20, 30, 0, 50]
         """
-        if addr >= len(self.cells):
-            self._extend_tape_upto_address(addr)
+        cells = self._cells
 
-        self.cells[addr] = value
+        if cells is not None:
+            if addr < len(cells):
+                try:
+                    cells[addr] = value
+                except OverflowError:
+                    self._promote()[addr] = value
+                return
+
+            if addr < len(cells) + SPARSE_GAP:
+                self._extend_tape_upto_address(addr)
+                self.write_to(addr, value)
+                return
+
+        elif addr < self._dense + SPARSE_GAP:
+            self._dense = max(self._dense, addr + 1)
+
+        self._page_for_write(addr >> PAGE_SHIFT)[addr & PAGE_MASK] = value
+        if cells is not None or addr >= self._dense:
+            self._end = max(self._end, addr + 1)
+
+    def reserve(self, addr):
+        """
+        Make sure that dense memory includes given address <addr>.
+
+        >>> t = Tape("1,2")
+        >>> t.reserve(3)
+        >>> t.cells
+        [1, 2, 0, 0]
+        """
+        if len(self.cells) <= addr:
+            self._extend_tape_upto_address(addr)
 
     def _extend_tape_upto_address(self, addr):
         """
-        Extend the tape to accommodate given address <addr>.
-        New cells carry the value of 0.
+        Extend dense memory to accommodate given address <addr>.
+        New cells carry the value of 0 or values from pages of sparse memory
+        that dense memory grows into. A page is taken only up to the largest
+        address written in sparse memory, dense memory does not grow beyond
+        1 + the largest address written to.
+
+        >>> t = Tape("1,2,3")
+        >>> t.write_to(SPARSE_GAP + 10, 5)
+        >>> t.write_to(4000, 1)
+        >>> t.write_to(4096, 1)
+        >>> len(t), len(t.cells)
+        (4107, 4107)
+        >>> t.append(9)
+        >>> len(t), t.at(4107), str(t)[-7:]
+        (4108, 9, '0,0,5,9')
         """
-        padding_length = 1 + addr - len(self.cells)
-        self.cells.extend([0]*padding_length)
+        cells = self._cells
+        while len(cells) <= addr:
+            size = len(cells)
+            idx = size >> PAGE_SHIFT
+            page = self._pages.pop(idx, None) if size & PAGE_MASK == 0 else None
+            if page is not None:
+                self._owned.discard(idx)
+                # the rest of the page has never been written
+                page = page[:max(self._end, addr + 1) - size]
+                if isinstance(cells, array):
+                    try:
+                        page = array("q", page)
+                    except OverflowError:
+                        cells = self._promote()
+                cells.extend(page)
+            else:
+                padding_length = min(1 + addr, (idx + 1) << PAGE_SHIFT) - size
+                if isinstance(cells, array):
+                    cells.frombytes(bytes(cells.itemsize * padding_length))
+                else:
+                    cells.extend([0]*padding_length)
+        if not self._pages:
+            self._end = 0
 
     def __str__(self):
         return self.dumps()
@@ -134,14 +466,47 @@ class Tape(object):
         #     # day 17p2: not sufficient
         #     data = [str(converter(i)) for i in self.cells]
         # else:
-        data = [str(i) for i in self.cells]
-        return ",".join(data)
+        size = len(self)
+        parts = []
+        pos = 0
+
+        for start, cells in self._chunks():
+            if start >= size:
+                break
+            if start > pos:
+                parts.append(("0," * (start - pos))[:-1])
+            cells = cells[:size - start]
+            parts.append(",".join([str(i) for i in cells]))
+            pos = start + len(cells)
+
+        if size > pos:
+            parts.append(("0," * (size - pos))[:-1])
+
+        return ",".join(parts)
+
+    def _chunks(self):
+        """
+        Generate (address, cells) for stored memory in the order of addresses.
+        """
+        if self._cells is not None and len(self._cells) > 0:
+            yield 0, self._cells
+        for idx in sorted(self._pages):
+            yield idx << PAGE_SHIFT, self._pages[idx]
 
     def append(self, data, converter=None):
         """
         Introduced in day 17p2
-        Add to the tape new element(s).
+        Add to the tape new element(s), after the largest address written to.
         TODO: support adding negative values
+
+        >>> t = Tape("1,2,3")
+        >>> t.append(["4", "5"], int)
+        >>> str(t)
+        '1,2,3,4,5'
+        >>> t.write_to(10**6, 6)
+        >>> t.append(7)
+        >>> len(t), t.at(5), t.at(10**6 + 1)
+        (1000002, 0, 7)
         """
 
         if isinstance(data, type([])):
@@ -150,6 +515,6 @@ class Tape(object):
         else:
             _d = converter(data) if converter else data
             if isinstance(_d, int):
-                self.cells.append(_d)
+                self.write_to(len(self), _d)
             else:
                 raise ValueError(f"Can not add value of type {type(_d)} to the tape: {data}")
@@ -0,0 +1,102 @@
+"""
+Tracing of Intcode program execution.
+
+An Interpreter with a Tracer attached reports executed instructions as
+TraceRecords to the sink of the tracer. A sink is any callable that takes one
+record, for example list.append or a StreamSink. The level of the tracer
+selects the instructions to report and is a combination of flags:
+
+  INSTRUCTION -- every instruction
+  IO          -- input and output instructions
+  JUMP        -- conditional jump instructions
+
+Without a tracer (tracer=None, the default), the interpreter runs its usual
+loop and tracing costs nothing.
+"""
+
+import sys
+from collections import namedtuple
+
+from .decoder import ARITY, MNEMONICS
+
+OFF         = 0
+INSTRUCTION = 1
+IO          = 2
+JUMP        = 4
+ALL         = INSTRUCTION | IO | JUMP
+
+TraceRecord = namedtuple("TraceRecord", ["address", "opcode", "operands", "result"])
+TraceRecord.__doc__ = """
+One executed instruction.
+  address  -- address of the instruction
+  opcode   -- opcode of the instruction
+  operands -- values of the parameters after applying parameter modes. If the
+              parameter is the address to write to, it is the address.
+  result   -- value written to memory (sum, multiply, comparisons, input),
+              value output, address of the next instruction (jumps),
+              new relative base (adjusting relative base), None (halt)
+"""
+
+def format_record(record):
+    """
+    >>> format_record(TraceRecord(4, 1, (2, 3, 0), 5))
+    'ADDR=4, SUM, operands (2, 3, 0) -> 5'
+    """
+    return (f"ADDR={record.address}, {MNEMONICS[record.opcode]}, "
+            f"operands {record.operands} -> {record.result}")
+
+class StreamSink(object):
+    """
+    Sink that prints trace records in human-readable format to a stream,
+    stderr by default.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def __call__(self, record):
+        print(f"  {format_record(record)}", file=self.stream or sys.stderr)
+
+class Tracer(object):
+    """
+    >>> records = []
+    >>> tracer = Tracer(records.append, IO|JUMP)
+    >>> sorted(tracer.opcodes)
+    [3, 4, 5, 6]
+    >>> tracer.wants(1), tracer.wants(4)
+    (False, True)
+    >>> tracer.emit(TraceRecord(0, 4, (7,), 7))
+    >>> records
+    [TraceRecord(address=0, opcode=4, operands=(7,), result=7)]
+    """
+
+    LEVELS = {
+        INSTRUCTION: set(ARITY),
+        IO:          {3, 4},
+        JUMP:        {5, 6},
+    }
+
+    def __init__(self, sink=None, level=ALL):
+        self.sink = sink or StreamSink()
+        self.level = level
+
+    @property
+    def level(self):
+        return self._level
+
+    @level.setter
+    def level(self, level):
+        self._level = level
+        self.opcodes = set()
+        for flag, opcodes in self.LEVELS.items():
+            if level & flag:
+                self.opcodes.update(opcodes)
+
+    def wants(self, opcode):
+        """
+        Return True if instructions with given <opcode> should be reported.
+        """
+        return opcode in self.opcodes
+
+    def emit(self, record):
+        self.sink(record)
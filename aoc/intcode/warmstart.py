@@ -0,0 +1,110 @@
+"""
+Warm start of Intcode programs.
+
+Before a program reads its first input (or outputs anything) it executes
+initialization code that does not depend on anything and is the same in every
+run. WarmStart executes this prefix of the program once, saves the state of
+the computer and brings new computers to that state, so that their execution
+starts right at the first I/O instruction.
+
+    prefix = WarmStart(tape)
+    for x, y in points:
+        computer = prefix.apply(Interpreter(Tape(), inputs=[x,y], outputs=readings))
+        computer.execute()
+
+WarmStart.of(tape) looks prefixes up by the hash of the program, computing
+them on first use. Prefixes of the <maxsize> most recently used programs are
+kept.
+"""
+
+from collections import OrderedDict
+
+from .tape import Tape
+from .interpreter import Interpreter
+from .memo import program_digest
+
+class WarmStart(object):
+    """
+    # the program counts from 1000 down to 0 before reading its input
+    >>> s = "1101,1000,0,20,1001,20,-1,20,1005,20,4,3,21,1002,21,2,21,4,21,99,0,0"
+    >>> prefix = WarmStart(s)
+    >>> prefix.steps, prefix.position
+    (2001, 11)
+    >>> computer = prefix.apply(Interpreter(Tape(), inputs=[21], outputs=[]))
+    >>> _ = computer.execute()
+    >>> computer.outputs
+    [42]
+
+    Prefixes are cached by the hash of the program
+
+    >>> WarmStart.of(Tape(s)) is WarmStart.of(Tape(s))
+    True
+
+    The prefix is executed from the beginning of the program, wherever the
+    given tape is positioned
+
+    >>> t = Tape("1101,5,0,20,3,21,1,20,21,22,4,22,99")
+    >>> _ = t.rewind(4)
+    >>> computer = WarmStart(t).apply(Interpreter(Tape(), inputs=[1], outputs=[]))
+    >>> _ = computer.execute()
+    >>> computer.outputs
+    [6]
+
+    Only a computer that has not been started can be warm started
+
+    >>> _ = prefix.apply(computer)
+    Traceback (most recent call last):
+    ...
+    ValueError: Can not warm start a computer that has already started
+    """
+
+    STOP = {3, 4, 99} # opcodes of instructions that end the prefix
+
+    cache = OrderedDict() # program digest -> WarmStart, least recently used first
+    maxsize = 64
+
+    @classmethod
+    def of(cls, tape):
+        digest = program_digest(tape)
+        prefix = cls.cache.get(digest)
+        if prefix is None:
+            prefix = cls.cache[digest] = cls(tape)
+            while len(cls.cache) > cls.maxsize:
+                cls.cache.popitem(last=False)
+        else:
+            cls.cache.move_to_end(digest)
+        return prefix
+
+    def __init__(self, tape):
+        computer = Interpreter(Tape(tape))
+        computer.tape.rewind()
+        computer.running = 1
+        computer.status = "STARTING"
+
+        self.steps = 0
+        while computer.running == 1 and computer.tape.at() % 100 not in self.STOP:
+            computer.step()
+            self.steps += 1
+
+        self.tape = computer.tape
+        self.position = self.tape.position
+        self.relative_base = computer.relative_base
+        self.running = computer.running
+        self.status = computer.status
+
+    def apply(self, computer):
+        """
+        Bring given <computer>, that has not been started yet, to the state at
+        the end of the prefix: memory, position on the tape and relative base.
+        Inputs and outputs of the computer are kept. Returns the computer, whose
+        execute() continues from the end of the prefix.
+        """
+        if computer.running != 0:
+            raise ValueError("Can not warm start a computer that has already started")
+
+        computer.tape.copy_from(self.tape, share=False)
+        computer.relative_base = self.relative_base
+        computer.running = self.running
+        computer.status = self.status
+
+        return computer
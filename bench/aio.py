@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: rings of Intcode machines running as asyncio tasks
+# (see aoc/intcode/aio.py) with different numbers of machines and quanta.
+#
+# Every machine reads a token, spins in a loop for a while, passes the token
+# plus 1 to the next machine and halts when the token reaches the limit.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from aoc.intcode import Tape, FastInterpreter
+from aoc.intcode.aio import Network
+
+SPIN  = 50   # iterations of the busy loop per token
+LIMIT = 500  # value of the token that stops machines
+
+PROGRAM = ",".join(map(str, [
+    3, 100,                # 0: read token into [100]
+    1101, SPIN, 0, 101,    # 2: [101] = SPIN
+    1001, 101, -1, 101,    # 6: [101] -= 1
+    1005, 101, 6,          # 10: spin while [101] != 0
+    1001, 100, 1, 100,     # 13: [100] += 1
+    4, 100,                # 17: pass the token on
+    1007, 100, LIMIT, 102, # 19: [102] = [100] < LIMIT
+    1005, 102, 0,          # 23: wait for the next token if so
+    99                     # 26
+]))
+
+def ring(size, quantum, tokens):
+    net = Network(quantum=quantum)
+    for i in range(size):
+        net.add(FastInterpreter(Tape(PROGRAM)), i)
+    for i in range(size):
+        net.connect(i, (i + 1) % size)
+    for i in range(min(tokens, size)):
+        net.send(i, 0)
+    net.execute()
+    return net
+
+def run_benchmark():
+    for size in [5, 50, 200]:
+        for quantum in [100, 1000, 10000]:
+            net = ring(size, quantum, tokens=size)
+            totals = net.totals
+            rates = [stats["steps_per_second"] for stats in net.stats.values()]
+            print(f"{size:4} machines, quantum {quantum:6}: "
+                  f"{totals['steps']:9} steps in {totals['seconds']:.3f}s, "
+                  f"{totals['steps_per_second']/1e6:.2f}M steps/s in total, "
+                  f"{min(rates)/1e6:.2f}-{max(rates)/1e6:.2f}M per machine, "
+                  f"{len(net.deadlocked)} left waiting")
+
+if __name__ == '__main__':
+    run_benchmark()
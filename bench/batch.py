@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: probing the tractor beam of day 19 point by point with
+# Interpreter and FastInterpreter vs all points in one BatchInterpreter.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import time
+
+from aoc.intcode import Tape, Interpreter, FastInterpreter, BatchInterpreter
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def probe_one_by_one(computer_class, program, points):
+    readings = []
+    for x, y in points:
+        computer_class(Tape(program), inputs=[x,y], outputs=readings).execute()
+    return readings
+
+def probe_in_batch(program, points):
+    outputs = BatchInterpreter(program, [[x,y] for x, y in points]).execute()
+    return [readings[0] for readings in outputs]
+
+def run_benchmark(sizes=(50, 100, 200)):
+    program = Tape.read_from_file(os.path.join(ROOT, "day.19", "input.txt"))
+
+    for size in sizes:
+        print(f"=== {size}x{size} points ===")
+        points = [(x, y) for y in range(size) for x in range(size)]
+        runs = [(cls.__name__, lambda cls=cls: probe_one_by_one(cls, program, points))
+                for cls in (Interpreter, FastInterpreter)]
+        runs.append(("BatchInterpreter", lambda: probe_in_batch(program, points)))
+
+        baseline = None
+        for name, run in runs:
+            started = time.perf_counter()
+            readings = run()
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"{name:>20}: area {sum(readings)} in {elapsed:.3f}s, "
+                  f"speedup {baseline/elapsed:.1f}x")
+
+if __name__ == '__main__':
+    run_benchmark()
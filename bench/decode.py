@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+# # #
+# Microbenchmark: decoding of instruction words.
+# Compares the former decoding algorithm of Interpreter.read_opcode (string
+# conversion and float division) against lookup in the precomputed decode table.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import timeit
+
+from aoc.intcode import Tape, Interpreter
+from aoc.intcode.decoder import DECODE_TABLE
+
+TAPES = {
+    13: "day.13/input.13.txt",
+    17: "day.17/input.txt",
+    19: "day.19/input.txt",
+}
+
+def legacy_decode(code):
+    """
+    Decoding as it was done by Interpreter.read_opcode before the decode table
+    was introduced.
+    """
+    param_modes = []
+    if code not in [1,2,3,4,5,6,7,8,99]:
+        for offset in range(2, len(str(code))):
+            pmode = int(code % 10**(offset+1) / 10**offset)
+            param_modes.append(pmode)
+        code = code % 100
+    while param_modes:
+        param_modes.pop(0)
+    return code
+
+def table_decode(code):
+    instr = DECODE_TABLE[code] if 0 <= code < len(DECODE_TABLE) else None
+    modes = instr.modes
+    for i in range(instr.arity):
+        modes[i]
+    return instr.opcode
+
+class _Enough(Exception):
+    pass
+
+class RecordingInterpreter(Interpreter):
+    """
+    Interpreter that records instruction words it executes and stops after
+    having executed <limit> instructions.
+    """
+
+    def __init__(self, tape, limit):
+        super().__init__(tape, inputs=[0]*limit, outputs=[])
+        self.words = []
+        self.limit = limit
+
+    def read_opcode(self):
+        if len(self.words) == self.limit:
+            raise _Enough()
+        self.words.append(self.tape.at())
+        return super().read_opcode()
+
+def instruction_words(tape, limit=10000):
+    """
+    Return instruction words in the order they get executed by the program
+    recorded on given <tape>.
+    """
+    computer = RecordingInterpreter(tape, limit)
+    try:
+        while not computer.finished:
+            computer.execute()
+    except _Enough:
+        pass
+    return computer.words
+
+def run_benchmark(number=20):
+    root = os.path.join(os.path.dirname(__file__), "..")
+    print("=== Decoding of instruction words ===")
+    for day, fname in TAPES.items():
+        tape = Tape.read_from_file(os.path.join(root, fname))
+        words = instruction_words(tape)
+
+        assert [legacy_decode(w) for w in words] == [table_decode(w) for w in words]
+
+        t_old = timeit.timeit(lambda: [legacy_decode(w) for w in words], number=number)
+        t_new = timeit.timeit(lambda: [table_decode(w) for w in words], number=number)
+
+        print(f"day {day}: {len(words)} words x {number}: "
+              f"legacy {t_old:.4f}s, table {t_new:.4f}s, speedup {t_old/t_new:.1f}x")
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: Interpreter.fork() vs copy.deepcopy(interpreter).
+# Makes many copies of a computer with a large memory, each copy then modifies
+# a few cells. Reports time and memory allocated.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import copy
+import time
+import tracemalloc
+
+from aoc.intcode import Tape, Interpreter
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def make_computer(size):
+    tape = Tape.read_from_file(os.path.join(ROOT, "day.13", "input.13.txt"))
+    tape.write_to(size-1, 0)
+    return Interpreter(tape, inputs=[], outputs=[])
+
+def measure(computer, clone, count, writes):
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    clones = []
+    for i in range(count):
+        other = clone(computer)
+        for w in range(writes):
+            other.tape.write_to((i * 7919 + w * 104729) % len(other.tape), i)
+        clones.append(other)
+
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak
+
+def run_benchmark(size=100000, count=1000, writes=4):
+    print(f"=== {count} copies of a computer with {size} cells, {writes} writes each ===")
+    results = {}
+    for title, clone in [("deepcopy", copy.deepcopy), ("fork", Interpreter.fork)]:
+        computer = make_computer(size)
+        n = count if title == "fork" else max(1, count // 10)
+        elapsed, peak = measure(computer, clone, n, writes)
+        results[title] = (elapsed/n, peak/n)
+        print(f"{title:>8}: {n} copies in {elapsed:.3f}s, "
+              f"{1e6*elapsed/n:.1f}us and {peak/n/1024:.1f}KiB per copy")
+
+    print(f"fork is {results['deepcopy'][0]/results['fork'][0]:.0f}x faster and uses "
+          f"{results['deepcopy'][1]/results['fork'][1]:.0f}x less memory per copy")
+
+if __name__ == '__main__':
+    run_benchmark()
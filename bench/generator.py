@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: ways of connecting the arcade game of day 13 to its computer
+#   uplink    -- the computer suspends after every output, the game collects
+#                outputs in its inputs (execute() with an uplink)
+#   run_until -- the game asks for 3 outputs at a time (Game.execute)
+#   generator -- the game iterates over Interpreter.run() (Game.run)
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import time
+
+from aoc.intcode import Tape, Interpreter, FastInterpreter
+from aoc.arcade import Game, PlayerFollower as Player
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+PROGRAM = os.path.join(ROOT, "day.13", "input.13.txt")
+EXPECTED = 9803
+
+def make_game(computer_class, program):
+    tape = Tape(program)
+    tape.cells[0] = 2 # play for free
+    game = Game((45,20), tape, render=Game.RENDER_NONE)
+    game.computer = computer_class(tape)
+    game.computer.set_uplink_to(game)
+    game.player = Player()
+    return game
+
+def play_uplink(game):
+    computer = game.computer
+    while not computer.finished:
+        computer.execute()
+        if len(game.inputs) == 3:
+            game._execute()
+
+def play_run_until(game):
+    game.execute()
+
+def play_generator(game):
+    game.run()
+
+MODES = {
+    "uplink"    : play_uplink,
+    "run_until" : play_run_until,
+    "generator" : play_generator,
+}
+
+def run_benchmark(repeat=3):
+    program = Tape.read_from_file(PROGRAM)
+    for computer_class in [Interpreter, FastInterpreter]:
+        print(f"=== {computer_class.__name__} ===")
+        for mode, play in MODES.items():
+            best = None
+            for _ in range(repeat):
+                game = make_game(computer_class, program)
+                started = time.perf_counter()
+                play(game)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            assert game.score == EXPECTED, f"{mode}: score {game.score}"
+            print(f"  {mode:10} {best:8.3f}s")
+
+if __name__ == '__main__':
+    run_benchmark()
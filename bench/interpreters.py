@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: Interpreter vs FastInterpreter on the day 11 painting robot,
+# the day 13 arcade and the day 19 drone scanner.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import time
+import importlib.util
+
+import numpy as np
+
+from aoc.intcode import Tape, Interpreter, FastInterpreter
+from aoc.arcade import Game
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def load_solution(day):
+    """
+    Import solution.py of given <day> as a module
+    """
+    fname = os.path.join(ROOT, f"day.{day:02}", "solution.py")
+    spec = importlib.util.spec_from_file_location(f"solution_{day}", fname)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def paint_hull(day11, computer_class):
+    """
+    Run the painting robot of day 11 (part 1) with a computer of given class.
+    Return the number of panels painted and the time elapsed.
+    """
+    tape = Tape.read_from_file(os.path.join(ROOT, "day.11", "input.11.txt"))
+    hull = np.zeros((100,80), dtype='int8')
+
+    robot = day11.PaintingRobot(tape, hull)
+    robot.computer = computer_class(tape, robot.outputs)
+    robot.computer.set_uplink_to(robot)
+
+    painted_panels = set()
+    robot.on_paint = lambda coord, oldcolor, newcolor: painted_panels.add(coord)
+    robot.move_to((49,29))
+
+    started = time.perf_counter()
+    robot.execute()
+    elapsed = time.perf_counter() - started
+
+    return len(painted_panels), elapsed
+
+def play_arcade(computer_class):
+    """
+    Run the day 13 game (part 1) with a computer of given class.
+    Return the number of blocks on the screen and the time elapsed.
+    """
+    tape = Tape.read_from_file(os.path.join(ROOT, "day.13", "input.13.txt"))
+    game = Game((45,20), tape)
+    game.computer = computer_class(tape)
+    game.computer.set_uplink_to(game)
+    game.draw = lambda x, y, tile: game.board.__setitem__((y,x), tile)
+
+    started = time.perf_counter()
+    game.execute()
+    elapsed = time.perf_counter() - started
+
+    return int((game.board == game.BLOCK).sum()), elapsed
+
+def scan_beam(computer_class, size=50):
+    """
+    Probe the area of <size> x <size> points with the day 19 drone program.
+    Return the number of points affected by the beam and the time elapsed.
+    """
+    program = Tape.read_from_file(os.path.join(ROOT, "day.19", "input.txt"))
+
+    started = time.perf_counter()
+    area = 0
+    for y in range(size):
+        for x in range(size):
+            readings = []
+            computer_class(Tape(program), inputs=[x,y], outputs=readings).execute()
+            area += readings[0]
+    elapsed = time.perf_counter() - started
+
+    return area, elapsed
+
+WORKLOADS = {
+    "day 11 painting robot": lambda cls: paint_hull(load_solution(11), cls),
+    "day 13 arcade":         play_arcade,
+    "day 19 drone scanner":  scan_beam,
+}
+
+def run_benchmark(classes=None):
+    classes = classes or [Interpreter, FastInterpreter]
+
+    for title, workload in WORKLOADS.items():
+        print(f"=== {title} ===")
+        results = {}
+        for cls in classes:
+            res, elapsed = workload(cls)
+            results[cls] = elapsed
+            print(f"{cls.__name__:>20}: result {res} in {elapsed:.3f}s, "
+                  f"speedup {results[classes[0]]/elapsed:.1f}x")
+
+if __name__ == '__main__':
+    run_benchmark()
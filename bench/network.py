@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: networks of Intcode machines exchanging packets, run by the
+# round robin Scheduler (see aoc/intcode/network.py) with different numbers
+# of machines and instruction budgets.
+#
+# Machines form a ring: every machine sends one packet to the next machine
+# and forwards every packet it gets until the counter in the packet reaches
+# the limit. Between packets, machines poll their empty mailboxes.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from aoc.intcode import Tape
+from aoc.intcode.network import Scheduler
+
+LIMIT = 200 # packets forwarded in every chain
+
+def ring_program(size, limit):
+    """
+    Text of the program of a machine in a ring of <size> machines. The machine
+    sends packet (address, 0) to the next machine and forwards every packet
+    (x, y) it gets as (address, y+1) while y is less than <limit>.
+    """
+    return ",".join(map(str, [
+        3, 200,                 #  0: read own address A
+        1001, 200, 1, 203,      #  2: D = A + 1, the next machine
+        1008, 203, size, 204,   #  6: T = D == size
+        1006, 204, 17,          # 10: if not T goto 17
+        1101, 0, 0, 203,        # 13: D = 0
+        1101, 0, 0, 202,        # 17: Y = 0
+        1105, 1, 46,            # 21: goto SEND
+        3, 201,                 # 24: LOOP: read X
+        1008, 201, -1, 204,     # 26: T = X == -1
+        1005, 204, 24,          # 30: if T goto LOOP
+        3, 202,                 # 33: read Y
+        1007, 202, limit, 204,  # 35: T = Y < limit
+        1006, 204, 24,          # 39: if not T goto LOOP
+        1001, 202, 1, 202,      # 42: Y += 1
+        4, 203, 4, 200, 4, 202, # 46: SEND: output D, A, Y
+        1105, 1, 24,            # 52: goto LOOP
+    ]))
+
+def run_benchmark():
+    for size in [10, 50, 200]:
+        program = Tape(ring_program(size, LIMIT))
+        for budget in [100, 1000, 10000]:
+            net = Scheduler(program, size, budget=budget)
+            reason = net.run()
+            stats = net.stats
+            print(f"{size:4} machines, budget {budget:6}: {reason}, "
+                  f"{stats['steps']:9} steps in {stats['seconds']:.3f}s, "
+                  f"{stats['steps_per_second']/1e6:.2f}M steps/s, "
+                  f"{stats['packets']:6} packets in {stats['rounds']:5} rounds, "
+                  f"max depth {stats['max_depth']}")
+
+if __name__ == '__main__':
+    run_benchmark()
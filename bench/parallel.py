@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: scaling of map_runs() from one to all cores on the probes
+# of the day 19 drone scanner.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import multiprocessing
+
+from aoc.intcode import Tape
+from aoc.intcode.parallel import map_runs
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def run_benchmark(counts=None, size=100, chunksize=64):
+    counts = counts or range(1, multiprocessing.cpu_count() + 1)
+    program = Tape.read_from_file(os.path.join(ROOT, "day.19", "input.txt"))
+    points = [(x, y) for y in range(size) for x in range(size)]
+
+    print(f"=== {size}x{size} probes of day 19, {multiprocessing.cpu_count()} cores ===")
+    baseline = None
+    for workers in counts:
+        stats = {}
+        area = sum(res.outputs[0] for res in map_runs(program, ([x,y] for x,y in points),
+                                                      workers, chunksize, stats=stats))
+        baseline = baseline or stats["runs_per_second"]
+        print(f"{workers:>3} workers: area {area}, {stats['runs_per_second']:8.0f} runs/s "
+              f"in {stats['elapsed']:.2f}s, speedup {stats['runs_per_second']/baseline:.1f}x")
+
+if __name__ == '__main__':
+    # numbers of workers to try can be given as arguments
+    run_benchmark([int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+# # #
+# Profile the day 13 arcade (part 1) and the day 19 drone program to find
+# hot loops. Prints the hottest instructions and, if a directory is given on
+# the command line, saves full reports as JSON there.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from aoc.intcode import Tape, Interpreter
+from aoc.arcade import Game
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def profile_arcade():
+    tape = Tape.read_from_file(os.path.join(ROOT, "day.13", "input.13.txt"))
+    game = Game((45,20), tape)
+    game.computer = Interpreter(tape)
+    game.computer.set_uplink_to(game)
+    game.draw = lambda x, y, tile: game.board.__setitem__((y,x), tile)
+
+    profiler = game.computer.profile()
+    game.execute()
+    return profiler, tape
+
+def profile_drone(x=25, y=40):
+    tape = Tape.read_from_file(os.path.join(ROOT, "day.19", "input.txt"))
+    computer = Interpreter(tape, inputs=[x,y], outputs=[])
+    profiler = computer.profile()
+    computer.execute()
+    return profiler, tape
+
+def report(title, profiler, tape, top=15, outdir=None):
+    print(f"=== {title}: {profiler.total} instructions ===")
+    lines = profiler.heatmap(tape).splitlines()
+    lines.sort(key=lambda l: -int(l.split()[1]))
+    print("\n".join(lines[:top]))
+
+    if outdir is not None:
+        fname = os.path.join(outdir, f"profile_{title.replace(' ', '_')}.json")
+        with open(fname, "w") as fd:
+            fd.write(profiler.to_json(indent=2))
+        print(f"Report saved to {fname}")
+
+if __name__ == '__main__':
+    outdir = sys.argv[1] if len(sys.argv) > 1 else None
+    report("day 13", *profile_arcade(), outdir=outdir)
+    report("day 19", *profile_drone(), outdir=outdir)
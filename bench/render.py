@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: the game of day 13 (part 2) played to the end in every render
+# mode of Game, with the board printed to /dev/null, in full or by
+# TerminalRenderer (only changed cells). Also compares building the text of
+# the board figure by figure (as Game.__str__ used to) with looking the
+# figures up through a table over the whole board.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import time
+from contextlib import redirect_stdout
+
+from aoc.intcode import Tape, FastInterpreter
+from aoc.arcade import Game, PlayerFollower as Player, TerminalRenderer
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+PROGRAM = os.path.join(ROOT, "day.13", "input.13.txt")
+EXPECTED = 9803
+
+MODES = [
+    ("every 1",  dict(render=Game.RENDER_EVERY)),
+    ("terminal", dict(render=Game.RENDER_EVERY, renderer=True)),
+    ("every 100", dict(render=Game.RENDER_EVERY, every=100)),
+    ("fps 25",   dict(render=Game.RENDER_FPS, fps=25)),
+    ("final",    dict(render=Game.RENDER_FINAL)),
+    ("none",     dict(render=Game.RENDER_NONE)),
+]
+
+def play(program, options):
+    options = dict(options)
+    renderer = options.pop("renderer", False)
+    tape = Tape(program)
+    tape.cells[0] = 2 # play for free
+    game = Game((45,20), tape, **options)
+    if renderer:
+        game.renderer = TerminalRenderer()
+    game.computer = FastInterpreter(tape)
+    game.computer.set_uplink_to(game)
+    game.player = Player()
+    game.execute()
+    assert game.score == EXPECTED, f"score {game.score}"
+    return game
+
+def old_str(game):
+    lines = []
+    for row in game.board:
+        lines.append("".join([game.figures[c] for c in row]))
+    lines.append(f"SCORE: {game.score}; PADDLE: {game.paddle}; BALL: {game.ball}")
+    return "\n".join(lines)
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_benchmark(repeat=3):
+    program = Tape.read_from_file(PROGRAM)
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        results = []
+        for title, options in MODES:
+            game = None
+            def run():
+                nonlocal game
+                game = play(program, options)
+            results.append((title, timed(run, repeat), game))
+
+    for title, elapsed, game in results:
+        print(f"{title:10} {elapsed:7.3f}s, {game.rendered:6} of {game.frames} frames rendered")
+        if game.renderer is not None:
+            stats = game.renderer.stats
+            full = game.rendered * (len(str(game)) + 1)
+            print(f"{'':10} {stats['frames_per_second']:.0f} frames/s, "
+                  f"{stats['bytes']} bytes written instead of {full}")
+
+    game = play(program, dict(render=Game.RENDER_NONE))
+    assert old_str(game) == str(game)
+    n = 1000
+    old = timed(lambda: [old_str(game) for _ in range(n)], repeat) / n
+    new = timed(lambda: [str(game) for _ in range(n)], repeat) / n
+    print(f"board to text: {old*1e6:.1f}us -> {new*1e6:.1f}us ({old/new:.1f}x)")
+
+if __name__ == '__main__':
+    run_benchmark()
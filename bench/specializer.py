@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: scanning the 50x50 area of day 19 with the program run on
+# FastInterpreter (from address 0 and warm started) vs the residual function
+# of the program specialized to its two inputs (see aoc/intcode/specializer.py)
+# with loops on inputs unrolled up to a given number of times.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import time
+
+from aoc.intcode import Tape, FastInterpreter
+from aoc.intcode.warmstart import WarmStart
+from aoc.intcode.specializer import Specializer
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+POINTS = [(x, y) for y in range(50) for x in range(50)]
+
+def interpreted(program):
+    for x, y in POINTS:
+        FastInterpreter(Tape(program), inputs=[x, y], outputs=[]).execute()
+
+def warm_started(program):
+    prefix = WarmStart.of(program)
+    for x, y in POINTS:
+        prefix.apply(FastInterpreter(Tape(), inputs=[x, y], outputs=[])).execute()
+
+def specialized(spec):
+    for x, y in POINTS:
+        spec(x, y)
+
+def timed(func, arg, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def run_benchmark(repeat=5):
+    program = Tape.read_from_file(os.path.join(ROOT, "day.19", "input.txt"))
+
+    base = timed(interpreted, program, repeat)
+    print(f"interpreted:  {base*1e3:7.1f}ms")
+    elapsed = timed(warm_started, program, repeat)
+    print(f"warm started: {elapsed*1e3:7.1f}ms ({base/elapsed:.2f}x)")
+
+    for unroll in range(1, 6):
+        started = time.perf_counter()
+        spec = Specializer(program, inputs=[None, None], unroll=unroll)
+        built = time.perf_counter() - started
+        spec.check(POINTS)
+        elapsed = timed(specialized, spec, repeat)
+        print(f"unroll {unroll}:     {elapsed*1e3:7.1f}ms ({base/elapsed:.2f}x), "
+              f"built in {built*1e3:.0f}ms, {spec.stats['paths']} paths, "
+              f"{len(spec.fallbacks)} fallbacks")
+
+if __name__ == '__main__':
+    run_benchmark()
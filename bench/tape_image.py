@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: loading large programs by parsing their text vs loading their
+# binary images (see aoc/intcode/image.py).
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import random
+import shutil
+import tempfile
+import time
+
+from aoc.intcode import Tape
+from aoc.intcode import image
+
+def synthetic_program(size, seed=19):
+    rnd = random.Random(seed)
+    values = [rnd.choice([rnd.randrange(22210), rnd.randrange(size), rnd.randrange(-10**6, 10**6)])
+              for _ in range(size)]
+    return ",".join(map(str, values))
+
+def timed(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def run_benchmark(sizes=(10**4, 10**5, 10**6, 4*10**6)):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            fname = os.path.join(tmpdir, f"prg.{size}.txt")
+            with open(fname, "w") as fd:
+                fd.write(synthetic_program(size) + "\n")
+
+            # the first load makes the image
+            Tape.read_from_file(fname, use_image=True)
+            nbytes = os.path.getsize(image.image_path(fname))
+            loader = "mmap" if nbytes >= image.MMAP_THRESHOLD else "read"
+            print(f"=== program of {size} cells, image {nbytes/2**20:.1f}MiB ({loader}) ===")
+
+            for storage in Tape.STORAGES:
+                text, t_text = timed(lambda: Tape.read_from_file(fname, storage, use_image=False))
+                binary, t_image = timed(lambda: Tape.read_from_file(fname, storage, use_image=True))
+                assert text.cells == binary.cells
+                print(f"{storage:>6}: text {t_text:.4f}s, image {t_image:.4f}s, "
+                      f"speedup {t_text/t_image:.1f}x")
+    finally:
+        shutil.rmtree(tmpdir)
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: memory taken by tapes of millions of cells stored in a list
+# vs stored in an array of 64-bit integers.
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import random
+import time
+import tracemalloc
+
+from aoc.intcode import Tape
+
+def synthetic_program(size, seed=19):
+    """
+    Program text of <size> cells with values typical for Intcode programs:
+    instruction words, addresses and constants.
+    """
+    rnd = random.Random(seed)
+    values = [rnd.choice([rnd.randrange(22210), rnd.randrange(size), rnd.randrange(-10**6, 10**6)])
+              for _ in range(size)]
+    return ",".join(map(str, values))
+
+def measure(text, storage):
+    tracemalloc.start()
+    started = time.perf_counter()
+    tape = Tape(text, storage=storage)
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tape, size, elapsed
+
+def run_benchmark(sizes=(10**6, 4*10**6)):
+    for size in sizes:
+        print(f"=== Tape of {size} cells ===")
+        text = synthetic_program(size)
+        results = {}
+        for storage in Tape.STORAGES:
+            tape, nbytes, elapsed = measure(text, storage)
+            results[storage] = nbytes
+            print(f"{storage:>6}: {nbytes/2**20:8.1f}MiB ({nbytes/size:.1f} bytes per cell), "
+                  f"parsed in {elapsed:.2f}s")
+            del tape
+        print(f"array takes {results['list']/results['array']:.1f}x less memory")
+
+if __name__ == '__main__':
+    run_benchmark()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+
+# # #
+# Benchmark: starting programs from address 0 vs warm starting them at their
+# first I/O instruction (see aoc/intcode/warmstart.py).
+#
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import time
+
+from aoc.intcode import Tape, Interpreter
+from aoc.intcode.warmstart import WarmStart
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+PROGRAMS = {
+    "day 13": os.path.join(ROOT, "day.13", "input.13.txt"),
+    "day 15": os.path.join(ROOT, "day.15", "input.txt"),
+    "day 17": os.path.join(ROOT, "day.17", "input.txt"),
+    "day 19": os.path.join(ROOT, "day.19", "input.txt"),
+}
+
+def cold_start(computer_class, program):
+    """
+    Run a computer from address 0 up to its first I/O instruction.
+    """
+    computer = computer_class(Tape(program), inputs=[], outputs=[])
+    computer.running = 1
+    while computer.running == 1 and computer.tape.at() % 100 not in WarmStart.STOP:
+        computer.step()
+    return computer
+
+def warm_start(computer_class, prefix):
+    return prefix.apply(computer_class(Tape(), inputs=[], outputs=[]))
+
+def timed(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+def run_benchmark(repeat=20):
+    for title, fname in PROGRAMS.items():
+        program = Tape.read_from_file(fname)
+        prefix = WarmStart(program)
+        print(f"=== {title}: prefix of {prefix.steps} instructions ===")
+        cold = timed(lambda: cold_start(Interpreter, program), repeat)
+        warm = timed(lambda: warm_start(Interpreter, prefix), repeat)
+        print(f"  cold {cold*1e3:8.3f}ms, warm {warm*1e3:8.3f}ms, speedup {cold/warm:.1f}x")
+
+if __name__ == '__main__':
+    run_benchmark()
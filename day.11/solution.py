@@ -4,7 +4,7 @@ import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from aoc.intcode import Tape, Interpreter
+from aoc.intcode import Tape, Channel, FastInterpreter as Interpreter
 
 import numpy as np
 np.set_printoptions(threshold=sys.maxsize)
@@ -20,8 +20,8 @@ class PaintingRobot(object):
     def __init__(self, program, canvas):
         self.program = program
         self.verbose = False
-        self.inputs = []
-        self.outputs = []
+        self.inputs = Channel()
+        self.outputs = Channel()
         self.computer = Interpreter(self.program, self.outputs)
         #self.computer.verbose = self.verbose
         self.computer.set_uplink_to(self)
@@ -41,41 +41,41 @@ class PaintingRobot(object):
 
         if self.running == 0:
             self.running = 1
-            color = self.canvas[self.position]
+            color = int(self.canvas[self.position])
             self.outputs.append(color)
-            self._vprint(f"Robot starts over cell {self.position} of color {color}:\n{self._show_canvas()}")
+            if self.verbose:
+                self._vprint(f"Robot starts over cell {self.position} of color {color}:\n{self._show_canvas()}")
 
         while True:
             self.num_iterations += 1
-            self._vprint(f"[Iteration #{self.num_iterations}] State of input buffer: {self.inputs}")
-
-            if len(self.inputs) == 2:
-                self.do_paint(self.inputs.pop(0))
-                self.do_turn(self.inputs.pop(0))
-                color = self.canvas[self.position]        
-                self._vprint(f"Robot ends up over cell {self.position} of color {color}:\n{self._show_canvas()}")
-                self.outputs.append(color)
-
-            elif len(self.inputs) > 2:
-                self._vprint("OOPS: too many instructions in the robots input buffer")
-
             self._vprint(f"Running computer with inputs {self.computer.inputs} ({self.computer.status})")
-            self.computer.execute()
+            reason = self.computer.run_until(outputs=2)
 
-            if self.computer.finished:
+            if reason == self.computer.HALTED:
                 self._vprint(f"Finished: {self.computer.finished}")
                 break
+
+            if reason != self.computer.OUTPUTS:
+                raise ValueError(f"Robot can not continue, the computer has stopped: {reason}")
+
+            self._vprint(f"[Iteration #{self.num_iterations}] State of input buffer: {self.inputs}")
+            self.do_paint(self.inputs.popleft())
+            self.do_turn(self.inputs.popleft())
+            color = int(self.canvas[self.position])
+            if self.verbose:
+                self._vprint(f"Robot ends up over cell {self.position} of color {color}:\n{self._show_canvas()}")
+            self.outputs.append(color)
     
     def read_input(self):
         code = None
         if len(self.inputs) > 0:
-            code = self.inputs.pop(0)
+            code = self.inputs.popleft()
         return arg
 
     def do_paint(self, color=None):
         _oldcolor = self.canvas[self.position]
         if color is None:
-            color = self.inputs.pop(0)
+            color = self.inputs.popleft()
         self.canvas[self.position] = color
         if self.on_paint is not None:
             self.on_paint(self.position, _oldcolor, color)
@@ -86,7 +86,7 @@ class PaintingRobot(object):
         Turn acccording to the instruction and move one step
         """
         if code is None:
-            code = self.inputs.pop(0)
+            code = self.inputs.popleft()
 
         if   code == 0: self.turns_index -= 1
         elif code == 1: self.turns_index += 1
@@ -5,6 +5,7 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from aoc.intcode import Tape, Interpreter
+from aoc.intcode.warmstart import WarmStart
 from aoc.arcade import Game, PlayerFollower as Player
 
 import numpy as np
@@ -31,7 +32,8 @@ def run_day_13_1():
     tape = Tape.read_from_file("input.13.txt")
     expected = 200
     
-    game = Game((45,20), tape)
+    game = Game((45,20), tape, render=Game.RENDER_NONE)
+    WarmStart.of(tape).apply(game.computer)
     game.verbose = True
     game.execute()
 
@@ -59,7 +61,9 @@ def run_day_13_2():
     tape.cells[0] = 2
     expected = 9803
 
-    game = Game((45,20), tape)
+    # the final state is printed below; set render=Game.RENDER_FPS to watch
+    game = Game((45,20), tape, render=Game.RENDER_NONE)
+    WarmStart.of(tape).apply(game.computer)
     game.verbose = not True
     game.player = Player()
 
@@ -9,7 +9,7 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 import random
 
-from aoc.intcode import Tape, Interpreter
+from aoc.intcode import Tape, Channel, Interpreter
 
 import numpy as np
 np.set_printoptions(linewidth=1000, threshold=np.inf)
@@ -33,8 +33,8 @@ class RemoteControl(object):
     def __init__(self, program=None):
         self.computer = None
         self._program = None
-        self.inputs = []
-        self.outputs = []
+        self.inputs = Channel()
+        self.outputs = Channel()
         if program is not None:
             self.program = program
         self.verbose = False
@@ -114,7 +114,7 @@ class RemoteControl(object):
         Interpret the status code from the repair droid
         """
         self._vprint(f"Droid is at {self.board.player} (distance: {self.board.distance_to(self.board.player)}) and emits status code: {self.droid_status_codes}")
-        code = self.droid_status_codes.pop(0)
+        code = self.droid_status_codes.popleft()
 
         pos = self.attempted_position()
 
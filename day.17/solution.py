@@ -9,7 +9,9 @@ import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from aoc.intcode import Tape, Interpreter
+from aoc.intcode import Tape, Channel, Interpreter
+from aoc.intcode.ascii import AsciiDecoder, encode, encode_lines
+from aoc.intcode.warmstart import WarmStart
 
 import random
 import numpy as np
@@ -75,47 +77,170 @@ class Board(object):
         chunks = [s1,  s2,s2,s2,  s3]
         return ",".join(chunks).split(',')
 
+class VideoFeed(object):
+    """
+    Decoder of the output of the robot split into frames: pictures that end
+    with an empty line. The first frame fixes the shape, later frames of the
+    same shape are stored as numpy arrays of ASCII codes in a ring buffer that
+    holds the last <keep> frames; only every <every>-th frame is converted
+    and stored (the first and the last one always are). Text that is not a
+    frame (prompts of the robot) is collected in <texts>.
+
+    >>> feed = VideoFeed(keep=2, every=2)
+    >>> feed.feed(encode("#..\\n.#.\\n..#\\n\\nMain:\\n\\n"))
+    >>> feed.feed(encode("...\\n###\\n...\\n\\n.#.\\n.#.\\n.#.\\n\\n"))
+    >>> feed.feed(encode("###\\n...\\n...\\n\\n") + [1063081])
+    >>> feed.finish()
+    >>> feed.count, feed.stored, feed.texts, feed.values
+    (4, 3, ['Main:'], [1063081])
+    >>> [feed.visualize(frame) for frame in feed.frames()]
+    ['.#.\\n.#.\\n.#.', '###\\n...\\n...']
+    >>> feed.visualize(feed.first.matrix)
+    '#..\\n.#.\\n..#'
+
+    The last frame may be not followed by an empty line, a prompt before the
+    first frame does not fix the shape
+
+    >>> feed = VideoFeed(keep=3, every=2)
+    >>> feed.feed(encode("Main:\\n\\n" + "#.\\n.#\\n\\n" * 3 + "##\\n##\\n"))
+    >>> feed.finish()
+    >>> feed.shape, feed.count, feed.stored, feed.texts
+    ((2, 2), 4, 3, ['Main:'])
+    >>> feed.visualize(feed.last.matrix)
+    '##\\n##'
+    """
+
+    def __init__(self, keep=1, every=1, verbose=False):
+        self.keep = keep
+        self.every = every
+        self.verbose = verbose # print stored frames and texts
+        self.shape = None      # (height, width) of frames
+        self.first = None      # Board of the first frame
+        self.count = 0         # number of frames in the feed
+        self.stored = 0        # number of frames stored in the ring buffer
+        self.texts = []
+        self.values = []       # non-ASCII values
+        self._decoder = AsciiDecoder()
+        self._buffer = None    # ring buffer: array (keep, height, width)
+        self._last = None      # text of the last frame, stored at finish()
+
+    def feed(self, codes):
+        decoder = self._decoder
+        decoder.feed(codes)
+        if decoder.values:
+            self.values.extend(decoder.values)
+            decoder.values = []
+        for text in decoder.frames():
+            self._add(text)
+
+    def finish(self):
+        """
+        Take the rest of the output and store the last frame if it has been
+        skipped.
+        """
+        text = self._decoder.read().strip("\n")
+        if text:
+            self._add(text)
+        if self._last is not None:
+            self._store(self._last)
+            self._last = None
+
+    def _add(self, text):
+        if self.shape is None and "\n" in text:
+            # a picture, not a prompt
+            lines = text.split("\n")
+            self.shape = (len(lines), len(lines[0]))
+            self._buffer = np.zeros((self.keep,) + self.shape, dtype=np.uint8)
+            self.first = Board()
+            self.first.matrix = np.array([encode(line) for line in lines])
+
+        height, width = self.shape or (0, 0)
+        if len(text) != height * (width + 1) - 1 or text.count("\n") != height - 1:
+            self.texts.append(text)
+            if self.verbose:
+                print(text, flush=True)
+            return
+
+        self.count += 1
+        if (self.count - 1) % self.every == 0:
+            self._store(text)
+            self._last = None
+        else:
+            self._last = text
+
+    def _store(self, text):
+        height, width = self.shape
+        codes = np.frombuffer(text.encode("ascii") + b"\n", dtype=np.uint8)
+        self._buffer[self.stored % self.keep] = codes.reshape(height, width + 1)[:, :width]
+        self.stored += 1
+        if self.verbose:
+            print(text, flush=True)
+
+    def frames(self):
+        """
+        Stored frames in the ring buffer, from the oldest to the latest.
+        """
+        n = min(self.stored, self.keep)
+        return [self._buffer[i % self.keep] for i in range(self.stored - n, self.stored)]
+
+    @property
+    def last(self):
+        """
+        Board of the latest stored frame.
+        """
+        if not self.stored:
+            return None
+        board = Board()
+        board.matrix = self._buffer[(self.stored - 1) % self.keep]
+        return board
+
+    @staticmethod
+    def visualize(frame):
+        return "\n".join(row.tobytes().decode("ascii") for row in np.asarray(frame, dtype=np.uint8))
+
 class BoardBuilder(object):
 
-    def __init__(self, tape=None):
-        self.inputs = []
+    CHUNK = 4096 # max number of outputs decoded at once
+
+    def __init__(self, tape=None, keep=1, every=1):
+        """
+        keep, every -- which frames of the video feed to store, see VideoFeed
+        """
+        self.inputs = Channel()
         if tape is not None:
-            self.computer = Interpreter(tape)
-            self.computer.set_uplink_to(self)
+            # outputs are decoded in bulk, CHUNK at a time
+            self.computer = Interpreter(tape, outputs=self.inputs)
+            # skip the long initialization of the program
+            WarmStart.of(tape).apply(self.computer)
         self.board = None
+        self.video = VideoFeed(keep, every, verbose=True)
         self.amount_of_dust = 0
 
     def execute(self):
-        rows = []
-        row = []
-
-        while not self.computer.finished:
-            self.computer.execute()
-
-            while len(self.inputs) > 0:
-                code = self.inputs.pop(0)
-
-                if code > 127:
-                    # Here we catch the value that is not the image pixel but the amount
-                    # of dust the robot has collected, as per the instruction:
-                    # > Once the cleanong robot finishes the programmed set of movements
-                    # > it will return to its docking station and report the amount of space
-                    # > dust it collected as a large, non-ASCII value in a single output
-                    # > instruction.
-                    self.amount_of_dust = code
-                else:
-                    ch = chr(code)
-                    print(ch, end='', flush=True)
-
-                    if chr(code) == '\n':
-                        if len(row) > 0:
-                            rows.append(row)
-                        row = []
-                    else:
-                        row.append(code)
-
-        self.board = Board()
-        self.board.matrix = np.array(rows)
+        computer = self.computer
+        video = self.video
+
+        while True:
+            reason = computer.run_until(outputs=self.CHUNK)
+            video.feed(self.inputs)
+            if reason == computer.HALTED:
+                break
+            if reason == computer.INPUT_NEEDED:
+                # nobody has provided the input, the computer asks for it on stdin
+                computer.step()
+        video.finish()
+
+        if video.values:
+            # Here we catch the value that is not the image pixel but the amount
+            # of dust the robot has collected, as per the instruction:
+            # > Once the cleanong robot finishes the programmed set of movements
+            # > it will return to its docking station and report the amount of space
+            # > dust it collected as a large, non-ASCII value in a single output
+            # > instruction.
+            self.amount_of_dust = video.values[-1]
+
+        # the image from the camera before the robot moves
+        self.board = video.first
 
         return self.board
 
@@ -181,10 +306,7 @@ class CommandEncoder(object):
         individual items and adding a newline after the last item.
         """
         tape = Tape()
-        separators = [','] * (len(items)-1) + ['\n']
-        for item,sep in zip(items,separators):
-            tape.append(item, ord)
-            tape.append(sep, ord)
+        tape.cells = encode_lines([",".join(items)])
         return tape
 
     def to_tapes(self, decomposition):
@@ -308,14 +430,16 @@ def run_day_17_2():
         commands.extend(list(t.cells))
 
     # provide continuous video feed?
-    # continous video feed will produce a full board after each robot movement
-    yes = [ord('y'), ord('\n')] # This is very slow!
-    no =  [ord('n'), ord('\n')]
+    # continous video feed will produce a full board after each robot movement.
+    # The program then executes ~130 times more instructions; decoding frames
+    # is cheap, see VideoFeed (BoardBuilder(tape, every=N) prints every Nth)
+    yes = encode_lines(["y"])
+    no =  encode_lines(["n"])
     commands.extend(no)
 
     # finally, launch the robot
     bb = BoardBuilder(tape)
-    bb.computer.inputs = commands
+    bb.computer.inputs = Channel(commands)
     bb.execute()
 
     res = bb.amount_of_dust
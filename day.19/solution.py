@@ -15,7 +15,8 @@ from collections import defaultdict
 from itertools import chain
 
 import numpy as np
-from aoc.intcode import Tape, Interpreter
+from aoc.intcode import Tape, Interpreter, BatchInterpreter
+from aoc.intcode.memo import RunCache, program_digest
 
 class BaseScanner(object):
 
@@ -23,10 +24,12 @@ class BaseScanner(object):
         self.tape = tape
         self.verbose = False
         self.coord = (-1,-1) # current space coordinate scanner is checking
+        self.cache = None # RunCache to look up readings in
 
     def execute(self, beam):
         self.beam = beam
         readings = []
+        digest = program_digest(self.tape) if self.cache is not None else None
 
         for self.coord in self.positions():
             if self.finished():
@@ -35,16 +38,30 @@ class BaseScanner(object):
             y,x = self.coord
             self._vprint(f"Position: {(x,y)}")
 
-            tape = Tape(self.tape)
-            tape.rewind() # TODO: necessary?
+            if self.cache is not None:
+                readings.extend(self.cache.run(self.tape, [x,y], digest=digest))
+            else:
+                tape = Tape(self.tape)
+                tape.rewind() # TODO: necessary?
+
+                computer = Interpreter(tape, inputs=[x,y], outputs=readings)
+                computer.execute()
 
-            computer = Interpreter(tape, inputs=[x,y], outputs=readings)
-            computer.execute()
             if readings.pop(0) == 1:
                 self.beam.add((y,x))
 
             self._vprint(str(self.beam))
 
+    def probe(self, coords):
+        """
+        Check all given points (vertical, horizontal) at once, running one
+        copy of the drone program per point in a batch.
+        Returns readings of the drones in the same order.
+        """
+        inputs = [[x,y] for y,x in coords]
+        outputs = BatchInterpreter(self.tape, inputs).execute()
+        return [readings[0] for readings in outputs]
+
     def finished(self):
         """
         Returns true if scanning can be stopped.
@@ -99,12 +116,23 @@ class Scanner1(BaseScanner):
     """
     def __init__(self, *args):
         super(self.__class__, self).__init__(*args)
+        self.size = 50 # size of the area to scan
+
+    def execute(self, beam):
+        """
+        The area is small enough to probe all its points in one batch.
+        """
+        self.beam = beam
+        coords = [(y,x) for y in range(self.size) for x in range(self.size)]
+        for coord, reading in zip(coords, self.probe(coords)):
+            if reading == 1:
+                self.beam.add(coord)
 
     def finished(self):
         """
-        In this task we need to scan area of 50x50 only
+        In this task we need to scan area of <size> x <size> only
         """
-        return self.coord[0] > 49 or self.coord[1] > 49
+        return self.coord[0] >= self.size or self.coord[1] >= self.size
 
 class Scanner2(BaseScanner):
     """
@@ -268,9 +296,12 @@ def run_day_19_1():
     else:
         print(f"FAILED: Expected {expected} but got {res}")
 
-def run_day_19_2():
+def run_day_19_2(cache_path=None):
     """
     TODO: runs really long: 80 min
+
+    Readings are cached in memory; with <cache_path>, they are also stored in
+    an SQLite database there and are kept across reruns.
     """
     print("=== Day 16, Task 2 (takes really long) ===")
 
@@ -279,8 +310,11 @@ def run_day_19_2():
 
     scanner = Scanner2(tape)
     scanner.verbose = not True
+    scanner.cache = RunCache(path=cache_path)
     beam = Beam(scanner.target_v)
-    scanner.execute(beam)
+    with scanner.cache:
+        scanner.execute(beam)
+    print(f"Probes looked up: {scanner.cache.stats}")
 
     # print("--- results ---")
     # print(beam)